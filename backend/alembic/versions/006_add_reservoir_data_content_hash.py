@@ -0,0 +1,32 @@
+"""Add content hash to reservoir data
+
+Revision ID: 006_add_reservoir_data_content_hash
+Revises: 005_add_data_integration_tables
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_add_reservoir_data_content_hash'
+down_revision = '005_add_data_integration_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('reservoir_data', sa.Column('content_sha256', sa.String(64), nullable=True))
+    
+    # One record per uploader and file content; NULL hashes (older rows) never collide
+    op.create_index(
+        'idx_reservoir_data_uploaded_by_content_sha256',
+        'reservoir_data',
+        ['uploaded_by', 'content_sha256'],
+        unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('idx_reservoir_data_uploaded_by_content_sha256')
+    op.drop_column('reservoir_data', 'content_sha256')
@@ -0,0 +1,40 @@
+"""Add keyset pagination indexes to seismic tables
+
+Revision ID: 007_add_seismic_keyset_indexes
+Revises: 006_add_reservoir_data_content_hash
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_add_seismic_keyset_indexes'
+down_revision = '006_add_reservoir_data_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Match the (created_at, id) DESC ordering and row comparison of the paginated list endpoints
+    op.create_index(
+        'idx_seismic_analyses_dataset_created',
+        'seismic_analyses',
+        ['dataset_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'idx_seismic_interpretations_dataset_created',
+        'seismic_interpretations',
+        ['dataset_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'idx_seismic_sessions_user_created',
+        'seismic_sessions',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade():
+    op.drop_index('idx_seismic_sessions_user_created', table_name='seismic_sessions')
+    op.drop_index('idx_seismic_interpretations_dataset_created', table_name='seismic_interpretations')
+    op.drop_index('idx_seismic_analyses_dataset_created', table_name='seismic_analyses')
@@ -0,0 +1,29 @@
+"""Add partial index for typed seismic interpretation lookups
+
+Revision ID: 008_add_seismic_interpretation_type_index
+Revises: 007_add_seismic_keyset_indexes
+Create Date: 2026-10-15 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_add_seismic_interpretation_type_index'
+down_revision = '007_add_seismic_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves the interpretation_type filter of the dataset interpretations list; inactive rows are never listed
+    op.create_index(
+        'idx_seismic_interpretations_dataset_type',
+        'seismic_interpretations',
+        ['dataset_id', 'interpretation_type', sa.text('created_at DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade():
+    op.drop_index('idx_seismic_interpretations_dataset_type', table_name='seismic_interpretations')
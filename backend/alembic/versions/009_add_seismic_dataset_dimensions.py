@@ -0,0 +1,29 @@
+"""Add generated grid dimension columns to seismic datasets
+
+Revision ID: 009_add_seismic_dataset_dimensions
+Revises: 008_add_seismic_interpretation_type_index
+Create Date: 2026-10-15 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_add_seismic_dataset_dimensions'
+down_revision = '008_add_seismic_interpretation_type_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('seismic_datasets', sa.Column(
+        'inline_count', sa.Integer(), sa.Computed('max_inline - min_inline + 1', persisted=True)
+    ))
+    op.add_column('seismic_datasets', sa.Column(
+        'crossline_count', sa.Integer(), sa.Computed('max_crossline - min_crossline + 1', persisted=True)
+    ))
+
+
+def downgrade():
+    op.drop_column('seismic_datasets', 'crossline_count')
+    op.drop_column('seismic_datasets', 'inline_count')
@@ -0,0 +1,26 @@
+"""Add token lookup indexes to user sessions
+
+Revision ID: 010_add_user_session_token_indexes
+Revises: 009_add_seismic_dataset_dimensions
+Create Date: 2026-10-15 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_add_user_session_token_indexes'
+down_revision = '009_add_seismic_dataset_dimensions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tokens are long and only ever matched by equality, which hash indexes serve compactly
+    op.create_index('idx_user_sessions_access_token', 'user_sessions', ['access_token'], postgresql_using='hash')
+    op.create_index('idx_user_sessions_refresh_token', 'user_sessions', ['refresh_token'], postgresql_using='hash')
+
+
+def downgrade():
+    op.drop_index('idx_user_sessions_refresh_token', table_name='user_sessions')
+    op.drop_index('idx_user_sessions_access_token', table_name='user_sessions')
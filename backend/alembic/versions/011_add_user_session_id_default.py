@@ -0,0 +1,23 @@
+"""Generate user session ids in the database
+
+Revision ID: 011_add_user_session_id_default
+Revises: 010_add_user_session_token_indexes
+Create Date: 2026-10-15 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_add_user_session_id_default'
+down_revision = '010_add_user_session_token_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('user_sessions', 'id', server_default=sa.text('gen_random_uuid()::text'))
+
+
+def downgrade():
+    op.alter_column('user_sessions', 'id', server_default=None)
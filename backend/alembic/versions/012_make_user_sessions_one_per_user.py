@@ -0,0 +1,32 @@
+"""Keep one session row per user
+
+Revision ID: 012_make_user_sessions_one_per_user
+Revises: 011_add_user_session_id_default
+Create Date: 2026-10-15 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_make_user_sessions_one_per_user'
+down_revision = '011_add_user_session_id_default'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only each user's most recent session before enforcing uniqueness
+    op.execute("""
+        DELETE FROM user_sessions s
+        USING user_sessions newer
+        WHERE newer.user_id = s.user_id
+          AND (newer.created_at, newer.id) > (s.created_at, s.id)
+    """)
+    op.drop_index(op.f('ix_user_sessions_user_id'), table_name='user_sessions')
+    op.create_index(op.f('ix_user_sessions_user_id'), 'user_sessions', ['user_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_sessions_user_id'), table_name='user_sessions')
+    op.create_index(op.f('ix_user_sessions_user_id'), 'user_sessions', ['user_id'], unique=False)
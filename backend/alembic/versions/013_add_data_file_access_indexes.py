@@ -0,0 +1,36 @@
+"""Add indexes for data file listing and share checks
+
+Revision ID: 013_add_data_file_access_indexes
+Revises: 012_make_user_sessions_one_per_user
+Create Date: 2026-10-15 17:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_add_data_file_access_indexes'
+down_revision = '012_make_user_sessions_one_per_user'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A user's own files, newest first
+    op.create_index(
+        'idx_data_files_uploaded_by_created_at',
+        'data_files',
+        ['uploaded_by', sa.text('created_at DESC')]
+    )
+    # Active-share probes by file and recipient
+    op.create_index(
+        'idx_file_shares_file_id_shared_with_active',
+        'file_shares',
+        ['file_id', 'shared_with'],
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade():
+    op.drop_index('idx_file_shares_file_id_shared_with_active', table_name='file_shares')
+    op.drop_index('idx_data_files_uploaded_by_created_at', table_name='data_files')
@@ -0,0 +1,33 @@
+"""Store data file tags as JSONB
+
+Revision ID: 014_convert_data_file_tags_to_jsonb
+Revises: 013_add_data_file_access_indexes
+Create Date: 2026-10-15 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '014_convert_data_file_tags_to_jsonb'
+down_revision = '013_add_data_file_access_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing values were written with json.dumps, so they cast directly
+    op.alter_column(
+        'data_files', 'tags',
+        type_=postgresql.JSONB(),
+        postgresql_using='tags::jsonb'
+    )
+
+
+def downgrade():
+    op.alter_column(
+        'data_files', 'tags',
+        type_=sa.Text(),
+        postgresql_using='tags::text'
+    )
@@ -0,0 +1,33 @@
+"""Cascade data file deletes to dependent rows
+
+Revision ID: 015_cascade_data_file_children
+Revises: 014_convert_data_file_tags_to_jsonb
+Create Date: 2026-10-15 18:30:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '015_cascade_data_file_children'
+down_revision = '014_convert_data_file_tags_to_jsonb'
+branch_labels = None
+depends_on = None
+
+# Tables whose file_id references data_files.id; 005 left the constraints with Postgres' default names
+CHILD_TABLES = ('file_metadata', 'file_access_logs', 'file_shares', 'data_integration_jobs')
+
+
+def _recreate_file_fk(table, ondelete):
+    constraint = f'{table}_file_id_fkey'
+    op.drop_constraint(constraint, table, type_='foreignkey')
+    op.create_foreign_key(constraint, table, 'data_files', ['file_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    for table in CHILD_TABLES:
+        _recreate_file_fk(table, 'CASCADE')
+
+
+def downgrade():
+    for table in CHILD_TABLES:
+        _recreate_file_fk(table, None)
@@ -0,0 +1,38 @@
+"""Add trigram and jsonb indexes for data file search
+
+Revision ID: 016_add_data_file_search_indexes
+Revises: 015_cascade_data_file_children
+Create Date: 2026-10-15 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016_add_data_file_search_indexes'
+down_revision = '015_cascade_data_file_children'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Serves the substring ILIKE on filename and description
+    op.create_index(
+        'idx_data_files_search_trgm',
+        'data_files',
+        [sa.text('original_filename gin_trgm_ops'), sa.text('description gin_trgm_ops')],
+        postgresql_using='gin'
+    )
+    # Serves tag containment (tags @> '["..."]')
+    op.create_index(
+        'idx_data_files_tags',
+        'data_files',
+        [sa.text('tags jsonb_path_ops')],
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('idx_data_files_tags', table_name='data_files')
+    op.drop_index('idx_data_files_search_trgm', table_name='data_files')
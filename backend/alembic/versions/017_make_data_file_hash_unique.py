@@ -0,0 +1,32 @@
+"""Make data file content hashes unique
+
+Revision ID: 017_make_data_file_hash_unique
+Revises: 016_add_data_file_search_indexes
+Create Date: 2026-10-15 19:30:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '017_make_data_file_hash_unique'
+down_revision = '016_add_data_file_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Later copies of content uploaded more than once keep their rows but give up the hash
+    op.execute("""
+        UPDATE data_files d
+        SET file_hash = NULL
+        FROM data_files keep
+        WHERE d.file_hash = keep.file_hash
+          AND (d.created_at, d.id) > (keep.created_at, keep.id)
+    """)
+    op.drop_index('idx_data_files_file_hash', table_name='data_files')
+    op.create_index('idx_data_files_file_hash', 'data_files', ['file_hash'], unique=True)
+
+
+def downgrade():
+    op.drop_index('idx_data_files_file_hash', table_name='data_files')
+    op.create_index('idx_data_files_file_hash', 'data_files', ['file_hash'])
@@ -0,0 +1,46 @@
+"""Add keyset pagination indexes to reservoir tables
+
+Revision ID: 018_add_reservoir_keyset_indexes
+Revises: 017_make_data_file_hash_unique
+Create Date: 2026-10-15 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '018_add_reservoir_keyset_indexes'
+down_revision = '017_make_data_file_hash_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Match the (sort key, id) DESC ordering and row comparison of the paginated list endpoints
+    op.create_index(
+        'idx_reservoir_data_created_id',
+        'reservoir_data',
+        [sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'idx_reservoir_simulations_created_id',
+        'reservoir_simulations',
+        [sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'idx_reservoir_forecasts_generated_id',
+        'reservoir_forecasts',
+        [sa.text('generated_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'idx_reservoir_warnings_created_id',
+        'reservoir_warnings',
+        [sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade():
+    op.drop_index('idx_reservoir_warnings_created_id', table_name='reservoir_warnings')
+    op.drop_index('idx_reservoir_forecasts_generated_id', table_name='reservoir_forecasts')
+    op.drop_index('idx_reservoir_simulations_created_id', table_name='reservoir_simulations')
+    op.drop_index('idx_reservoir_data_created_id', table_name='reservoir_data')
@@ -0,0 +1,32 @@
+"""Add a partial index for paging unacknowledged warnings
+
+Revision ID: 019_add_unacknowledged_warning_index
+Revises: 018_add_reservoir_keyset_indexes
+Create Date: 2026-10-15 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '019_add_unacknowledged_warning_index'
+down_revision = '018_add_reservoir_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Matches the urgency ordering and keyset comparison of get_unacknowledged_warnings
+    op.create_index(
+        'idx_reservoir_warnings_unacknowledged',
+        'reservoir_warnings',
+        [sa.text('severity_level DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('NOT is_acknowledged')
+    )
+    # Forecast ownership probes for the per-user filter
+    op.create_index('idx_reservoir_forecasts_created_by', 'reservoir_forecasts', ['created_by'])
+
+
+def downgrade():
+    op.drop_index('idx_reservoir_forecasts_created_by', table_name='reservoir_forecasts')
+    op.drop_index('idx_reservoir_warnings_unacknowledged', table_name='reservoir_warnings')
@@ -1,9 +1,10 @@
 from typing import List, Optional
-from functools import wraps
+from functools import wraps, lru_cache
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.database.config import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.config import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.services.auth_service import auth_service
 
@@ -47,8 +48,9 @@ class RolePermissions:
     }
     
     @classmethod
+    @lru_cache(maxsize=None)
     def has_permission(cls, role: UserRole, permission: str) -> bool:
-        """Check if role has specific permission"""
+        """Check if role has specific permission (cached per role/permission pair)"""
         return permission in cls.PERMISSIONS.get(role, [])
     
     @classmethod
@@ -57,6 +59,24 @@ class RolePermissions:
         return cls.PERMISSIONS.get(role, [])
 
 
+def _authenticated(user: Optional[User]) -> User:
+    """Reject a missing or disabled user"""
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is disabled"
+        )
+    
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -64,22 +84,26 @@ async def get_current_user(
     """Get current authenticated user"""
     try:
         access_token = credentials.credentials
-        user = await auth_service.get_current_user(access_token, db)
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="User account is disabled"
-            )
+        return _authenticated(await auth_service.get_current_user(access_token, db))
         
-        return user
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user for routes served from an AsyncSession"""
+    try:
+        access_token = credentials.credentials
+        return _authenticated(await auth_service.get_current_user_async(access_token, db))
         
     except HTTPException:
         raise
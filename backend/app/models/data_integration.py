@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, DateTime, Integer, Boolean, Enum, Text, Float, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.database.config import Base
 import enum
@@ -43,7 +44,7 @@ class DataFile(Base):
     file_size = Column(Integer, nullable=False)  # Size in bytes
     file_type = Column(Enum(FileType), nullable=False)
     mime_type = Column(String(100), nullable=True)
-    file_hash = Column(String(64), nullable=True)  # SHA-256 hash for integrity
+    file_hash = Column(String(64), nullable=True, unique=True)  # SHA-256 hash for integrity and deduplication
     
     # Upload information
     uploaded_by = Column(String, ForeignKey("users.id"), nullable=False)
@@ -58,7 +59,7 @@ class DataFile(Base):
     
     # Metadata
     description = Column(Text, nullable=True)
-    tags = Column(Text, nullable=True)  # JSON string of tags
+    tags = Column(JSONB, nullable=True)  # List of tag strings
     location = Column(String(255), nullable=True)  # Geographic location
     acquisition_date = Column(DateTime(timezone=True), nullable=True)
     
@@ -78,7 +79,7 @@ class FileMetadata(Base):
     __tablename__ = "file_metadata"
     
     id = Column(String, primary_key=True, index=True)
-    file_id = Column(String, ForeignKey("data_files.id"), nullable=False)
+    file_id = Column(String, ForeignKey("data_files.id", ondelete="CASCADE"), nullable=False)
     
     # Extracted metadata fields
     width = Column(Integer, nullable=True)  # For images/maps
@@ -102,7 +103,7 @@ class FileAccessLog(Base):
     __tablename__ = "file_access_logs"
     
     id = Column(String, primary_key=True, index=True)
-    file_id = Column(String, ForeignKey("data_files.id"), nullable=False)
+    file_id = Column(String, ForeignKey("data_files.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     
     action = Column(String(50), nullable=False)  # upload, download, view, delete, etc.
@@ -119,7 +120,7 @@ class FileShare(Base):
     __tablename__ = "file_shares"
     
     id = Column(String, primary_key=True, index=True)
-    file_id = Column(String, ForeignKey("data_files.id"), nullable=False)
+    file_id = Column(String, ForeignKey("data_files.id", ondelete="CASCADE"), nullable=False)
     shared_by = Column(String, ForeignKey("users.id"), nullable=False)
     shared_with = Column(String, ForeignKey("users.id"), nullable=False)
     
@@ -137,7 +138,7 @@ class DataIntegrationJob(Base):
     __tablename__ = "data_integration_jobs"
     
     id = Column(String, primary_key=True, index=True)
-    file_id = Column(String, ForeignKey("data_files.id"), nullable=False)
+    file_id = Column(String, ForeignKey("data_files.id", ondelete="CASCADE"), nullable=False)
     job_type = Column(String(50), nullable=False)  # format_conversion, metadata_extraction, validation
     
     status = Column(Enum(ProcessingStatus), default=ProcessingStatus.PENDING)
@@ -32,6 +32,8 @@ class WarningLevel(enum.Enum):
 
 class ReservoirData(Base):
     __tablename__ = "reservoir_data"
+    # Fetch server-generated timestamps with RETURNING on INSERT/UPDATE instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -39,6 +41,7 @@ class ReservoirData(Base):
     data_type = Column(Enum(ReservoirDataType), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer, nullable=True)
+    content_sha256 = Column(String(64), nullable=True)  # Unique per uploader, used to dedupe re-uploads
     metadata = Column(JSON, nullable=True)  # Store additional properties like porosity, permeability, etc.
     
     # Spatial and temporal information
@@ -62,6 +65,8 @@ class ReservoirData(Base):
 
 class ReservoirSimulation(Base):
     __tablename__ = "reservoir_simulations"
+    # Fetch server-generated timestamps with RETURNING on INSERT/UPDATE instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -99,6 +104,8 @@ class ReservoirSimulation(Base):
 
 class ReservoirForecast(Base):
     __tablename__ = "reservoir_forecasts"
+    # Fetch server-generated timestamps with RETURNING on INSERT/UPDATE instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -142,6 +149,8 @@ class ReservoirForecast(Base):
 
 class ReservoirWarning(Base):
     __tablename__ = "reservoir_warnings"
+    # Fetch server-generated timestamps with RETURNING on INSERT/UPDATE instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, index=True)
     forecast_id = Column(String, ForeignKey("reservoir_forecasts.id"), nullable=False)
@@ -179,6 +188,8 @@ class ReservoirWarning(Base):
 
 class PredictionSession(Base):
     __tablename__ = "prediction_sessions"
+    # Fetch server-generated timestamps with RETURNING on INSERT/UPDATE instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, index=True)
     session_name = Column(String(255), nullable=False)
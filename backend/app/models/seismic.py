@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, JSON, ForeignKey, func, LargeBinary
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, JSON, ForeignKey, func, LargeBinary, Computed
 from sqlalchemy.orm import relationship
 from app.database.config import Base
 
@@ -22,6 +22,10 @@ class SeismicDataset(Base):
     min_time = Column(Float)  # in milliseconds
     max_time = Column(Float)
     
+    # Grid dimensions, maintained by the database from the spatial extent
+    inline_count = Column(Integer, Computed("max_inline - min_inline + 1", persisted=True))
+    crossline_count = Column(Integer, Computed("max_crossline - min_crossline + 1", persisted=True))
+    
     # Metadata
     sample_rate = Column(Float)  # sample interval in ms
     trace_count = Column(Integer)
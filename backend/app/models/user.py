@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Enum, func, Text
+from sqlalchemy import Column, String, DateTime, Boolean, Enum, func, Text, text
 from sqlalchemy.orm import relationship
 from app.database.config import Base
 import enum
@@ -16,6 +16,8 @@ class UserRole(enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    # Fetch created_at/updated_at with RETURNING on INSERT/UPDATE instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, index=True)  # Supabase user ID
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -49,8 +51,8 @@ class User(Base):
 class UserSession(Base):
     __tablename__ = "user_sessions"
     
-    id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, nullable=False, index=True)
+    id = Column(String, primary_key=True, index=True, server_default=text("gen_random_uuid()::text"))
+    user_id = Column(String, nullable=False, unique=True, index=True)  # One current session per user
     access_token = Column(Text, nullable=False)
     refresh_token = Column(Text, nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -6,7 +6,7 @@ from app.database.config import get_db
 from app.schemas.auth import (
     UserLogin, UserSignup, TokenResponse, UserResponse, SignupResponse,
     UserUpdate, PasswordReset, TokenRefresh, ChangePassword, 
-    EmailConfirmation, ResendConfirmation
+    EmailConfirmation, ResendConfirmation, UserBatchRequest, USER_RESPONSE_LIST
 )
 from app.models.user import User, UserRole
 from app.services.auth_service import auth_service
@@ -163,7 +163,6 @@ async def update_current_user(
             setattr(current_user, field, value)
         
         db.commit()
-        db.refresh(current_user)
         
         return UserResponse.model_validate(current_user)
     except HTTPException:
@@ -211,7 +210,18 @@ async def list_users(
 ):
     """List all users (admin only)"""
     users = db.query(User).offset(skip).limit(limit).all()
-    return [UserResponse.model_validate(user) for user in users]
+    return USER_RESPONSE_LIST.validate_python(users, from_attributes=True)
+
+
+@router.post("/users/batch", response_model=List[UserResponse])
+async def batch_get_users(
+    batch_request: UserBatchRequest,
+    current_user: User = Depends(require_manager_or_admin),
+    db: Session = Depends(get_db)
+):
+    """Get several users by ID in one request (manager/admin only)"""
+    users = await auth_service.batch_get_users(batch_request.user_ids, db)
+    return USER_RESPONSE_LIST.validate_python(users, from_attributes=True)
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -221,7 +231,7 @@ async def get_user(
     db: Session = Depends(get_db)
 ):
     """Get user by ID (manager/admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -238,7 +248,7 @@ async def update_user(
     db: Session = Depends(get_db)
 ):
     """Update user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -252,7 +262,6 @@ async def update_user(
             setattr(user, field, value)
         
         db.commit()
-        db.refresh(user)
         
         return UserResponse.model_validate(user)
     except Exception as e:
@@ -297,7 +306,7 @@ async def deactivate_user(
     db: Session = Depends(get_db)
 ):
     """Deactivate user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -317,7 +326,7 @@ async def activate_user(
     db: Session = Depends(get_db)
 ):
     """Activate user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
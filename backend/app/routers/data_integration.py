@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status, Request
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status, Request, Response, BackgroundTasks, Header
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-import json
+from urllib.parse import urlparse
+import orjson
 
-from app.database.config import get_db
-from app.auth.dependencies import get_current_user
+from app.database.config import get_db, get_async_db
+from app.auth.dependencies import get_current_user, get_current_user_async
 from app.models.user import User
 from app.services.data_integration_service import data_integration_service
+from app.utils.orjson_response import ModelJSONResponse
 from app.schemas.data_integration import (
     FileUploadRequest, FileUpdateRequest, FileShareRequest, MetadataUpdateRequest,
     DataFileResponse, FileUploadResponse, FileUploadStatusResponse,
@@ -17,9 +20,22 @@ from app.schemas.data_integration import (
 router = APIRouter(prefix="/api/data-integration", tags=["Data Integration"])
 
 
-@router.post("/upload", response_model=FileUploadResponse)
+def _file_etag(db_file) -> str:
+    """Build a weak validator for file metadata from its hash and last update time"""
+    last_modified = db_file.updated_at or db_file.created_at
+    version = last_modified.timestamp() if last_modified else 0
+    return f'W/"{(db_file.file_hash or db_file.id)[:16]}-{version:.6f}"'
+
+
+@router.post(
+    "/upload",
+    response_model=None,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={202: {"model": FileUploadResponse}}
+)
 async def upload_file(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     file_type: FileTypeEnum = Form(...),
     description: Optional[str] = Form(None),
@@ -27,9 +43,10 @@ async def upload_file(
     location: Optional[str] = Form(None),
     acquisition_date: Optional[str] = Form(None),  # ISO format string
     is_public: bool = Form(False),
+    content_sha256: Optional[str] = Header(None, alias="X-Content-SHA256"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
-):
+) -> FileUploadResponse:
     """
     Upload a new data file to the system.
     
@@ -40,14 +57,20 @@ async def upload_file(
     4. System processes data and stores it
     5. System confirms successful upload
     6. System displays upload summary
+    
+    The file is validated and registered before responding with 202 Accepted; the transfer
+    to storage runs afterwards, so poll /upload/{file_id}/status for its outcome.
+    
+    Clients may send the file's SHA-256 in X-Content-SHA256 so duplicates are rejected
+    before the body is read; the server still verifies it against the received content.
     """
     try:
         # Parse tags if provided
         tags_list = None
         if tags:
             try:
-                tags_list = json.loads(tags)
-            except json.JSONDecodeError:
+                tags_list = orjson.loads(tags)
+            except orjson.JSONDecodeError:
                 tags_list = [tag.strip() for tag in tags.split(",")]
         
         # Parse acquisition date if provided
@@ -75,7 +98,9 @@ async def upload_file(
             file=file,
             upload_request=upload_request,
             user_id=current_user.id,
-            db=db
+            db=db,
+            background_tasks=background_tasks,
+            declared_hash=content_sha256
         )
         
         # Log upload action with client info (this is handled in the service)
@@ -94,18 +119,18 @@ async def upload_file(
 @router.get("/upload/{file_id}/status", response_model=FileUploadStatusResponse)
 async def get_upload_status(
     file_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get the upload and processing status of a file.
     
     This endpoint provides real-time status updates during the upload and processing phases.
     """
-    return data_integration_service.get_file_upload_status(file_id, db)
+    return await data_integration_service.get_file_upload_status(file_id, db)
 
 
-@router.get("/files", response_model=FileListResponse)
+@router.get("/files", response_model=None, responses={200: {"model": FileListResponse}})
 async def get_files(
     file_type: Optional[str] = None,
     status: Optional[str] = None,
@@ -113,9 +138,9 @@ async def get_files(
     search: Optional[str] = None,
     page: int = 1,
     page_size: int = 20,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> FileListResponse:
     """
     Get list of files with filtering and pagination.
     
@@ -124,7 +149,7 @@ async def get_files(
     if page_size > 100:
         page_size = 100  # Limit page size
     
-    result = data_integration_service.get_files(
+    result = await data_integration_service.get_files(
         db=db,
         user_id=current_user.id,
         file_type=file_type,
@@ -135,66 +160,64 @@ async def get_files(
         page_size=page_size
     )
     
-    return FileListResponse(**result)
+    # Items were validated by the service; build the envelope without re-validating and serialize once
+    return ModelJSONResponse(FileListResponse.model_construct(**result))
 
 
-@router.get("/files/{file_id}", response_model=DataFileResponse)
+@router.get("/files/{file_id}", response_model=None, responses={200: {"model": DataFileResponse}})
 async def get_file_details(
     file_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> DataFileResponse:
     """Get detailed information about a specific file."""
     # This will be implemented by checking access and returning file details
-    db_file = data_integration_service._check_file_access(db, file_id, current_user.id, "read")
+    db_file = await data_integration_service._check_file_access_async(db, file_id, current_user.id, "read")
     
-    # Convert to response format (similar to the get_files method)
-    tags = json.loads(db_file.tags) if db_file.tags else []
+    # Skip re-serialization when the client already has the current version
+    etag = _file_etag(db_file)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     
-    return DataFileResponse(
-        id=db_file.id,
-        original_filename=db_file.original_filename,
-        file_path=db_file.file_path,
-        file_size=db_file.file_size,
-        file_type=db_file.file_type,
-        mime_type=db_file.mime_type,
-        file_hash=db_file.file_hash,
-        uploaded_by=db_file.uploaded_by,
-        upload_timestamp=db_file.upload_timestamp,
-        status=db_file.status,
-        processing_status=db_file.processing_status,
-        processing_started_at=db_file.processing_started_at,
-        processing_completed_at=db_file.processing_completed_at,
-        processing_error=db_file.processing_error,
-        description=db_file.description,
-        tags=tags,
-        location=db_file.location,
-        acquisition_date=db_file.acquisition_date,
-        is_public=db_file.is_public,
-        is_archived=db_file.is_archived,
-        created_at=db_file.created_at,
-        updated_at=db_file.updated_at
-    )
+    return DataFileResponse.model_validate(db_file)
 
 
-@router.get("/files/{file_id}/download")
+@router.get("/files/{file_id}/download", status_code=status.HTTP_307_TEMPORARY_REDIRECT)
 async def download_file(
     file_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Download a file.
     
-    Returns a redirect to the signed URL for file download.
+    Returns a 307 redirect to the signed URL, so the client fetches the file straight from storage.
+    The download is logged after the redirect has been sent.
     """
-    download_url = data_integration_service.get_file_download_url(
+    download_url = await data_integration_service.get_file_download_url(
         file_id=file_id,
         user_id=current_user.id,
         db=db
     )
     
-    return RedirectResponse(url=download_url)
+    # Let the browser open the storage connection while following the redirect
+    storage_url = urlparse(download_url)
+    headers = {}
+    if storage_url.hostname:
+        headers["Link"] = f"<{storage_url.scheme or 'https'}://{storage_url.netloc}>; rel=preconnect"
+    
+    background_tasks.add_task(data_integration_service.record_file_access, file_id, current_user.id, "download")
+    
+    return RedirectResponse(
+        url=download_url,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers=headers,
+        background=background_tasks
+    )
 
 
 @router.put("/files/{file_id}", response_model=DataFileResponse)
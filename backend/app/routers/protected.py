@@ -13,121 +13,72 @@ router = APIRouter(prefix="/protected", tags=["Protected Routes"])
 
 
 # Dashboard endpoints - different access levels
-@router.get("/dashboard/field")
-async def field_dashboard(
-    current_user: User = Depends(require_field_access)
-):
-    """Field team dashboard - requires field team access or higher"""
-    return {
-        "message": "Field Team Dashboard",
-        "user_role": current_user.role.value,
-        "data": {
-            "upload_status": "active",
-            "recent_uploads": [],
-            "data_points_today": 150
-        }
-    }
-
-
-@router.get("/dashboard/geoscience")
-async def geoscience_dashboard(
-    current_user: User = Depends(get_current_active_user)
-):
-    """Geoscience dashboard - requires specific permissions"""
-    if not RolePermissions.has_permission(current_user.role, "analyze_seismic"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Requires seismic analysis permissions"
-        )
-    
-    return {
-        "message": "Geoscience Dashboard",
-        "user_role": current_user.role.value,
-        "data": {
-            "seismic_models": [],
-            "analysis_queue": 5,
-            "annotations_pending": 3
-        }
-    }
-
-
-@router.get("/dashboard/engineering")
-async def engineering_dashboard(
-    current_user: User = Depends(get_current_active_user)
-):
-    """Reservoir engineering dashboard"""
-    if not RolePermissions.has_permission(current_user.role, "model_simulations"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Requires modeling permissions"
-        )
-    
-    return {
-        "message": "Reservoir Engineering Dashboard",
-        "user_role": current_user.role.value,
-        "data": {
-            "simulations_running": 2,
-            "forecasts_generated": 15,
-            "models_available": 8
-        }
-    }
-
-
-@router.get("/dashboard/environmental")
-async def environmental_dashboard(
-    current_user: User = Depends(get_current_active_user)
-):
-    """Environmental dashboard"""
-    if not RolePermissions.has_permission(current_user.role, "impact_assessments"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Requires environmental assessment permissions"
-        )
-    
-    return {
-        "message": "Environmental Dashboard",
-        "user_role": current_user.role.value,
-        "data": {
-            "assessments_pending": 4,
-            "compliance_reports": 12,
-            "monitoring_active": True
+# (name, access dependency, required permission, denial detail, title, data)
+DASHBOARDS = [
+    ("field", require_field_access, None, None, "Field Team Dashboard", {
+        "upload_status": "active",
+        "recent_uploads": [],
+        "data_points_today": 150
+    }),
+    ("geoscience", get_current_active_user, "analyze_seismic",
+     "Requires seismic analysis permissions", "Geoscience Dashboard", {
+        "seismic_models": [],
+        "analysis_queue": 5,
+        "annotations_pending": 3
+    }),
+    ("engineering", get_current_active_user, "model_simulations",
+     "Requires modeling permissions", "Reservoir Engineering Dashboard", {
+        "simulations_running": 2,
+        "forecasts_generated": 15,
+        "models_available": 8
+    }),
+    ("environmental", get_current_active_user, "impact_assessments",
+     "Requires environmental assessment permissions", "Environmental Dashboard", {
+        "assessments_pending": 4,
+        "compliance_reports": 12,
+        "monitoring_active": True
+    }),
+    ("management", require_manager_or_admin, None, None, "Management Dashboard", {
+        "system_health": "optimal",
+        "active_users": 45,
+        "reports_generated": 128,
+        "alerts": []
+    }),
+    ("admin", require_admin, None, None, "Administrator Dashboard", {
+        "total_users": 50,
+        "system_uptime": "99.9%",
+        "storage_usage": "45%",
+        "security_alerts": 0,
+        "pending_user_requests": 3
+    }),
+]
+
+
+def _make_dashboard_handler(dependency, permission, denial_detail, title, data):
+    """Build a dashboard handler from its DASHBOARDS table entry"""
+    async def dashboard(current_user: User = Depends(dependency)):
+        if permission and not RolePermissions.has_permission(current_user.role, permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=denial_detail
+            )
+        
+        return {
+            "message": title,
+            "user_role": current_user.role.value,
+            "data": data
         }
-    }
-
+    return dashboard
 
-@router.get("/dashboard/management")
-async def management_dashboard(
-    current_user: User = Depends(require_manager_or_admin)
-):
-    """Management dashboard - requires manager or admin role"""
-    return {
-        "message": "Management Dashboard",
-        "user_role": current_user.role.value,
-        "data": {
-            "system_health": "optimal",
-            "active_users": 45,
-            "reports_generated": 128,
-            "alerts": []
-        }
-    }
 
-
-@router.get("/dashboard/admin")
-async def admin_dashboard(
-    current_user: User = Depends(require_admin)
-):
-    """Admin dashboard - admin only"""
-    return {
-        "message": "Administrator Dashboard",
-        "user_role": current_user.role.value,
-        "data": {
-            "total_users": 50,
-            "system_uptime": "99.9%",
-            "storage_usage": "45%",
-            "security_alerts": 0,
-            "pending_user_requests": 3
-        }
-    }
+for _name, _dependency, _permission, _denial_detail, _title, _data in DASHBOARDS:
+    router.add_api_route(
+        f"/dashboard/{_name}",
+        _make_dashboard_handler(_dependency, _permission, _denial_detail, _title, _data),
+        methods=["GET"],
+        name=f"{_name}_dashboard",
+        summary=_title
+    )
 
 
 # Data upload endpoints
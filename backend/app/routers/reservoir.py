@@ -1,47 +1,175 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, FrozenSet
 import uuid
 import os
-import json
+import hashlib
+import asyncio
+import threading
+import aiofiles
+import orjson
+import simdjson
+from cachetools import TTLCache
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 
 from app.database.config import get_db
 from app.auth.dependencies import get_current_user
 from app.models.user import User, UserRole
-from app.services.reservoir_service import ReservoirService
+from app.models.reservoir import (
+    ReservoirData, ReservoirSimulation, ReservoirForecast, PredictionSession,
+    WarningLevel as WarningLevelModel
+)
+from app.services.reservoir_service import reservoir_service, encode_warning_cursor
 from app.schemas.reservoir import (
     ReservoirDataCreate, ReservoirDataResponse, ReservoirDataUpdate, ReservoirDataList,
     ReservoirSimulationCreate, ReservoirSimulationResponse, ReservoirSimulationUpdate, ReservoirSimulationList,
     ReservoirForecastResponse, ReservoirForecastUpdate, ReservoirForecastList,
-    ReservoirWarningResponse, ReservoirWarningList, WarningAcknowledgmentRequest,
+    ReservoirWarningResponse, ReservoirWarningList, ReservoirWarningCursorPage, WarningAcknowledgmentRequest,
     PredictionSessionCreate, PredictionSessionResponse, PredictionSessionList,
     PredictiveAnalysisRequest, SimulationComparisonRequest,
+    RESERVOIR_DATA_LIST, RESERVOIR_SIMULATION_LIST, RESERVOIR_FORECAST_LIST, RESERVOIR_WARNING_LIST,
     ReservoirDataType, SimulationStatus, ForecastStatus, WarningLevel
 )
 from app.tasks.reservoir_tasks import run_reservoir_simulation, run_predictive_analysis
-
-router = APIRouter(prefix="/reservoir", tags=["reservoir"])
+from app.utils.orjson_response import ORJSONResponse, ModelJSONResponse
 
 # File upload configuration
 UPLOAD_DIR = Path("uploads/reservoir")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-ALLOWED_EXTENSIONS = {'.csv', '.xlsx', '.xls', '.json', '.txt'}
+ALLOWED_EXTENSIONS = frozenset({'.csv', '.xlsx', '.xls', '.json', '.txt'})
+_FILE_TYPE_NOT_ALLOWED = f"File type not allowed. Supported: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB
+
+# Dashboard summaries are read-mostly; repeats within the TTL are served from memory
+DASHBOARD_CACHE_TTL = 10  # seconds
+_dashboard_cache = TTLCache(maxsize=2048, ttl=DASHBOARD_CACHE_TTL)
+_dashboard_cache_lock = threading.Lock()
+
+# One simdjson parser per worker thread, reused so it keeps its internal buffers
+_json_parsers = threading.local()
+
+
+def _validate_json_file(file_path: Path) -> None:
+    """Parse a stored JSON data file, raising ValueError if it is malformed"""
+    parser = getattr(_json_parsers, "parser", None)
+    if parser is None:
+        parser = _json_parsers.parser = simdjson.Parser()
+    parser.load(str(file_path))
+
+
+# Role sets checked by the endpoints below
+OWNER_ROLES = frozenset({UserRole.RESERVOIR_ENGINEER, UserRole.ADMIN})
+WRITE_ROLES = OWNER_ROLES | {UserRole.GEOSCIENTIST}
+READ_ROLES = WRITE_ROLES | {UserRole.MANAGER}
+# Roles that may see and act on records created by other users
+VIEW_ALL_ROLES = frozenset({UserRole.ADMIN, UserRole.MANAGER})
+MODIFY_ALL_ROLES = frozenset({UserRole.ADMIN})
 
 
-def validate_user_role(user: User, allowed_roles: List[UserRole]):
+def validate_user_role(user: User, allowed_roles: FrozenSet[UserRole]):
     """Validate user has required role"""
     if user.role not in allowed_roles:
         raise HTTPException(
             status_code=403,
-            detail=f"Access denied. Required roles: {[role.value for role in allowed_roles]}"
+            detail=f"Access denied. Required roles: {sorted(role.value for role in allowed_roles)}"
         )
 
 
+@lru_cache(maxsize=None)
+def require_reservoir_roles(allowed_roles: FrozenSet[UserRole]):
+    """Dependency factory returning the current user if their role is allowed.
+
+    Cached per role set so every route sharing a set shares one dependency,
+    which FastAPI then resolves only once per request.
+    """
+    async def dependency(current_user: User = Depends(get_current_user)) -> User:
+        validate_user_role(current_user, allowed_roles)
+        return current_user
+    return dependency
+
+
+# Every endpoint needs at least a read role; routes requiring more declare their own set.
+# The dependency is shared with those declarations, so the user is only resolved once.
+router = APIRouter(
+    prefix="/reservoir",
+    tags=["reservoir"],
+    default_response_class=ORJSONResponse,
+    dependencies=[Depends(require_reservoir_roles(READ_ROLES))]
+)
+
+
+def _check_owner(current_user: User, owner_id: str, bypass_roles: FrozenSet[UserRole]):
+    """Reject access to another user's record unless the role may bypass ownership"""
+    if current_user.role not in bypass_roles and owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+def owned_reservoir_data(allowed_roles: FrozenSet[UserRole], bypass_roles: FrozenSet[UserRole]):
+    """Dependency factory loading reservoir data the current user may access"""
+    def dependency(
+        data_id: str,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(require_reservoir_roles(allowed_roles))
+    ) -> ReservoirData:
+        data = reservoir_service.get_reservoir_data(db, data_id)
+        if not data:
+            raise HTTPException(status_code=404, detail="Reservoir data not found")
+        _check_owner(current_user, data.uploaded_by, bypass_roles)
+        return data
+    return dependency
+
+
+def owned_simulation(allowed_roles: FrozenSet[UserRole], bypass_roles: FrozenSet[UserRole]):
+    """Dependency factory loading a simulation the current user may access"""
+    def dependency(
+        simulation_id: str,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(require_reservoir_roles(allowed_roles))
+    ) -> ReservoirSimulation:
+        simulation = reservoir_service.get_reservoir_simulation(db, simulation_id)
+        if not simulation:
+            raise HTTPException(status_code=404, detail="Simulation not found")
+        _check_owner(current_user, simulation.created_by, bypass_roles)
+        return simulation
+    return dependency
+
+
+def owned_forecast(allowed_roles: FrozenSet[UserRole], bypass_roles: FrozenSet[UserRole]):
+    """Dependency factory loading a forecast the current user may access"""
+    def dependency(
+        forecast_id: str,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(require_reservoir_roles(allowed_roles))
+    ) -> ReservoirForecast:
+        forecast = reservoir_service.get_reservoir_forecast(db, forecast_id)
+        if not forecast:
+            raise HTTPException(status_code=404, detail="Forecast not found")
+        _check_owner(current_user, forecast.created_by, bypass_roles)
+        return forecast
+    return dependency
+
+
+def owned_prediction_session(allowed_roles: FrozenSet[UserRole], bypass_roles: FrozenSet[UserRole]):
+    """Dependency factory loading a prediction session the current user may access"""
+    def dependency(
+        session_id: str,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(require_reservoir_roles(allowed_roles))
+    ) -> PredictionSession:
+        session = reservoir_service.get_prediction_session(db, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Prediction session not found")
+        _check_owner(current_user, session.created_by, bypass_roles)
+        return session
+    return dependency
+
+
 # Reservoir Data Endpoints
 @router.post("/data/upload", response_model=ReservoirDataResponse)
 async def upload_reservoir_data(
@@ -54,39 +182,22 @@ async def upload_reservoir_data(
     time_range_end: Optional[str] = Form(None),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_reservoir_roles(WRITE_ROLES))
 ):
     """Upload reservoir data file"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.ADMIN])
-    
     # Validate file
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file selected")
     
-    file_extension = Path(file.filename).suffix.lower()
+    file_extension = os.path.splitext(file.filename)[1].lower()
     if file_extension not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"File type not allowed. Supported: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-    
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large")
-    
-    # Save file
-    file_id = str(uuid.uuid4())
-    file_path = UPLOAD_DIR / f"{file_id}_{file.filename}"
-    
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+        raise HTTPException(status_code=400, detail=_FILE_TYPE_NOT_ALLOWED)
     
     # Parse metadata and location data
     try:
-        parsed_metadata = json.loads(metadata) if metadata else None
-        parsed_location_data = json.loads(location_data) if location_data else None
-    except json.JSONDecodeError:
+        parsed_metadata = orjson.loads(metadata) if metadata else None
+        parsed_location_data = orjson.loads(location_data) if location_data else None
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON format in metadata or location_data")
     
     # Parse datetime strings
@@ -96,123 +207,152 @@ async def upload_reservoir_data(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid datetime format")
     
-    # Create data record
-    data_create = ReservoirDataCreate(
-        name=name,
-        description=description,
-        data_type=data_type,
-        metadata=parsed_metadata,
-        location_data=parsed_location_data,
-        time_range_start=parsed_time_start,
-        time_range_end=parsed_time_end
-    )
+    # Stream file to disk, checking size as it arrives
+    file_id = str(uuid.uuid4())
+    file_path = UPLOAD_DIR / f"{file_id}_{file.filename}"
     
-    reservoir_service = ReservoirService(db)
-    reservoir_data = reservoir_service.create_reservoir_data(
-        data_create, 
-        current_user.id, 
-        str(file_path), 
-        len(file_content)
-    )
+    try:
+        file_size = 0
+        hasher = hashlib.sha256()
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    break
+                hasher.update(chunk)
+                await f.write(chunk)
+        
+        if file_size > MAX_FILE_SIZE:
+            raise HTTPException(status_code=400, detail="File too large")
+        
+        # Re-uploading identical bytes returns the user's existing record
+        content_sha256 = hasher.hexdigest()
+        existing_data = await run_in_threadpool(
+            reservoir_service.get_data_by_hash, db, current_user.id, content_sha256
+        )
+        if existing_data:
+            file_path.unlink(missing_ok=True)
+            return existing_data
+        
+        # Reject malformed JSON data files before they are registered
+        if file_extension == '.json':
+            try:
+                await asyncio.to_thread(_validate_json_file, file_path)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid JSON data file")
+        
+        # Create data record
+        data_create = ReservoirDataCreate(
+            name=name,
+            description=description,
+            data_type=data_type,
+            metadata=parsed_metadata,
+            location_data=parsed_location_data,
+            time_range_start=parsed_time_start,
+            time_range_end=parsed_time_end
+        )
+        
+        # Sync session work runs in the threadpool so the event loop stays free
+        reservoir_data = await run_in_threadpool(
+            reservoir_service.create_reservoir_data,
+            db,
+            data_create, 
+            current_user.id, 
+            str(file_path), 
+            file_size,
+            content_sha256
+        )
+    except BaseException:
+        # Whatever failed, never leave an unregistered upload on disk
+        file_path.unlink(missing_ok=True)
+        raise
+    
+    # A concurrent upload of the same bytes won the insert; keep only its file
+    if reservoir_data.file_path != str(file_path):
+        file_path.unlink(missing_ok=True)
     
     return reservoir_data
 
 
-@router.get("/data", response_model=ReservoirDataList)
-async def get_reservoir_data_list(
+@router.get("/data", response_model=None, responses={200: {"model": ReservoirDataList}})
+def get_reservoir_data_list(
     data_type: Optional[ReservoirDataType] = Query(None),
     is_processed: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; when set, page is ignored"),
+    exact_count: bool = Query(False),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
+) -> ModelJSONResponse:
     """Get list of reservoir data"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
     skip = (page - 1) * page_size
-    reservoir_service = ReservoirService(db)
     
     # Only show own data unless admin/manager
-    user_filter = current_user.id if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] else None
+    user_filter = current_user.id if current_user.role not in VIEW_ALL_ROLES else None
     
     items, total = reservoir_service.get_reservoir_data_list(
+        db,
         user_id=user_filter,
         data_type=data_type,
         is_processed=is_processed,
         skip=skip,
-        limit=page_size
+        limit=page_size + 1,  # One extra row tells us whether another page follows
+        exact_count=exact_count,
+        after_id=cursor
     )
     
-    return ReservoirDataList(items=items, total=total, page=page, page_size=page_size)
+    return ModelJSONResponse(ReservoirDataList.model_construct(
+        items=RESERVOIR_DATA_LIST.validate_python(items[:page_size], from_attributes=True), total=total, page=page, page_size=page_size,
+        has_more=len(items) > page_size,
+        next_cursor=items[page_size - 1].id if len(items) > page_size else None
+    ))
 
 
 @router.get("/data/{data_id}", response_model=ReservoirDataResponse)
-async def get_reservoir_data(
-    data_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+def get_reservoir_data(
+    data: ReservoirData = Depends(owned_reservoir_data(READ_ROLES, VIEW_ALL_ROLES))
 ):
     """Get specific reservoir data"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    data = reservoir_service.get_reservoir_data(data_id)
-    
-    if not data:
-        raise HTTPException(status_code=404, detail="Reservoir data not found")
-    
-    # Check ownership unless admin/manager
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] and data.uploaded_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     return data
 
 
+@router.get("/data/{data_id}/download")
+def download_reservoir_data(
+    data: ReservoirData = Depends(owned_reservoir_data(READ_ROLES, VIEW_ALL_ROLES))
+):
+    """Download the stored reservoir data file"""
+    file_path = Path(data.file_path)
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="Reservoir data file not found")
+    
+    # Stored as "<uuid>_<original filename>"; FileResponse streams it with sendfile where available
+    original_filename = file_path.name.split("_", 1)[-1]
+    return FileResponse(
+        path=str(file_path),
+        filename=original_filename,
+        media_type="application/octet-stream"
+    )
+
+
 @router.put("/data/{data_id}", response_model=ReservoirDataResponse)
-async def update_reservoir_data(
-    data_id: str,
+def update_reservoir_data(
     data_update: ReservoirDataUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    data: ReservoirData = Depends(owned_reservoir_data(WRITE_ROLES, MODIFY_ALL_ROLES)),
+    db: Session = Depends(get_db)
 ):
     """Update reservoir data"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    data = reservoir_service.get_reservoir_data(data_id)
-    
-    if not data:
-        raise HTTPException(status_code=404, detail="Reservoir data not found")
-    
-    # Check ownership unless admin
-    if current_user.role != UserRole.ADMIN and data.uploaded_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    updated_data = reservoir_service.update_reservoir_data(data_id, data_update)
+    updated_data = reservoir_service.update_reservoir_data(db, data.id, data_update)
     return updated_data
 
 
 @router.delete("/data/{data_id}")
-async def delete_reservoir_data(
-    data_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+def delete_reservoir_data(
+    data: ReservoirData = Depends(owned_reservoir_data(OWNER_ROLES, MODIFY_ALL_ROLES)),
+    db: Session = Depends(get_db)
 ):
     """Delete reservoir data"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    data = reservoir_service.get_reservoir_data(data_id)
-    
-    if not data:
-        raise HTTPException(status_code=404, detail="Reservoir data not found")
-    
-    # Check ownership unless admin
-    if current_user.role != UserRole.ADMIN and data.uploaded_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    success = reservoir_service.delete_reservoir_data(data_id)
+    success = reservoir_service.delete_reservoir_data(db, data.id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete reservoir data")
     
@@ -221,19 +361,14 @@ async def delete_reservoir_data(
 
 # Reservoir Simulation Endpoints
 @router.post("/simulations", response_model=ReservoirSimulationResponse)
-async def create_reservoir_simulation(
+def create_reservoir_simulation(
     simulation: ReservoirSimulationCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_reservoir_roles(WRITE_ROLES))
 ):
     """Create and start reservoir simulation"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    
     # Verify reservoir data exists and is accessible
-    reservoir_data = reservoir_service.get_reservoir_data(simulation.reservoir_data_id)
+    reservoir_data = reservoir_service.get_reservoir_data(db, simulation.reservoir_data_id)
     if not reservoir_data:
         raise HTTPException(status_code=404, detail="Reservoir data not found")
     
@@ -241,85 +376,74 @@ async def create_reservoir_simulation(
         raise HTTPException(status_code=400, detail="Reservoir data is not processed yet")
     
     # Create simulation
-    created_simulation = reservoir_service.create_reservoir_simulation(simulation, current_user.id)
+    created_simulation = reservoir_service.create_reservoir_simulation(db, simulation, current_user.id)
     
-    # Start background task
-    background_tasks.add_task(run_reservoir_simulation.delay, created_simulation.id)
+    # Enqueue simulation on the Celery worker
+    run_reservoir_simulation.delay(created_simulation.id)
     
     return created_simulation
 
 
-@router.get("/simulations", response_model=ReservoirSimulationList)
-async def get_simulation_list(
+@router.get("/simulations", response_model=None, responses={200: {"model": ReservoirSimulationList}})
+def get_simulation_list(
     reservoir_data_id: Optional[str] = Query(None),
     status: Optional[SimulationStatus] = Query(None),
     extraction_scenario: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; when set, page is ignored"),
+    exact_count: bool = Query(False),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
+) -> ModelJSONResponse:
     """Get list of simulations"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
     skip = (page - 1) * page_size
-    reservoir_service = ReservoirService(db)
     
     # Only show own simulations unless admin/manager
-    user_filter = current_user.id if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] else None
+    user_filter = current_user.id if current_user.role not in VIEW_ALL_ROLES else None
     
     items, total = reservoir_service.get_simulation_list(
+        db,
         user_id=user_filter,
         reservoir_data_id=reservoir_data_id,
         status=status,
         extraction_scenario=extraction_scenario,
         skip=skip,
-        limit=page_size
+        limit=page_size + 1,  # One extra row tells us whether another page follows
+        exact_count=exact_count,
+        after_id=cursor
     )
     
-    return ReservoirSimulationList(items=items, total=total, page=page, page_size=page_size)
+    return ModelJSONResponse(ReservoirSimulationList.model_construct(
+        items=RESERVOIR_SIMULATION_LIST.validate_python(items[:page_size], from_attributes=True), total=total, page=page, page_size=page_size,
+        has_more=len(items) > page_size,
+        next_cursor=items[page_size - 1].id if len(items) > page_size else None
+    ))
 
 
 @router.get("/simulations/{simulation_id}", response_model=ReservoirSimulationResponse)
-async def get_simulation(
-    simulation_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+def get_simulation(
+    simulation: ReservoirSimulation = Depends(owned_simulation(READ_ROLES, VIEW_ALL_ROLES))
 ):
     """Get specific simulation"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    simulation = reservoir_service.get_reservoir_simulation(simulation_id)
-    
-    if not simulation:
-        raise HTTPException(status_code=404, detail="Simulation not found")
-    
-    # Check ownership unless admin/manager
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] and simulation.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     return simulation
 
 
 @router.post("/simulations/compare")
-async def compare_simulations(
+def compare_simulations(
     comparison_request: SimulationComparisonRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
 ):
     """Compare different extraction scenarios"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    simulations = reservoir_service.get_simulation_comparison_data(comparison_request.simulation_ids)
+    simulations = reservoir_service.get_simulation_comparison_data(db, comparison_request.simulation_ids)
     
     if len(simulations) != len(comparison_request.simulation_ids):
         raise HTTPException(status_code=404, detail="One or more simulations not found or not completed")
     
     # Check access permissions
     for simulation in simulations:
-        if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] and simulation.created_by != current_user.id:
+        if current_user.role not in VIEW_ALL_ROLES and simulation.created_by != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied to one or more simulations")
     
     # Generate comparison data
@@ -344,21 +468,16 @@ async def compare_simulations(
 
 # Predictive Analysis Endpoints (Main Flow)
 @router.post("/predictive-analysis", response_model=PredictionSessionResponse)
-async def run_predictive_analysis_endpoint(
+def run_predictive_analysis_endpoint(
     analysis_request: PredictiveAnalysisRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_reservoir_roles(WRITE_ROLES))
 ):
     """Run predictive analysis (implements the main flow)"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    
     # Step 1: Reservoir Engineer navigates to predictive analytics interface (handled by frontend)
     
     # Step 2: Verify data sources exist and are accessible
-    data_sources = reservoir_service.get_data_for_analysis(analysis_request.data_source_ids)
+    data_sources = reservoir_service.get_data_for_analysis(db, analysis_request.data_source_ids)
     if not data_sources:
         raise HTTPException(status_code=404, detail="No valid data sources found")
     
@@ -387,11 +506,10 @@ async def run_predictive_analysis_endpoint(
         }
     )
     
-    session = reservoir_service.create_prediction_session(session_create, current_user.id)
+    session = reservoir_service.create_prediction_session(db, session_create, current_user.id)
     
     # Start background analysis task (Steps 3-8 handled in background)
-    background_tasks.add_task(
-        run_predictive_analysis.delay, 
+    run_predictive_analysis.delay(
         session.id, 
         session_create.ml_pipeline_config
     )
@@ -399,211 +517,189 @@ async def run_predictive_analysis_endpoint(
     return session
 
 
-@router.get("/forecasts", response_model=ReservoirForecastList)
-async def get_forecast_list(
+@router.get("/forecasts", response_model=None, responses={200: {"model": ReservoirForecastList}})
+def get_forecast_list(
     simulation_id: Optional[str] = Query(None),
     status: Optional[ForecastStatus] = Query(None),
     model_type: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; when set, page is ignored"),
+    exact_count: bool = Query(False),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
+) -> ModelJSONResponse:
     """Get list of forecasts"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
     skip = (page - 1) * page_size
-    reservoir_service = ReservoirService(db)
     
     # Only show own forecasts unless admin/manager
-    user_filter = current_user.id if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] else None
+    user_filter = current_user.id if current_user.role not in VIEW_ALL_ROLES else None
     
     items, total = reservoir_service.get_forecast_list(
+        db,
         user_id=user_filter,
         simulation_id=simulation_id,
         status=status,
         model_type=model_type,
         skip=skip,
-        limit=page_size
+        limit=page_size + 1,  # One extra row tells us whether another page follows
+        exact_count=exact_count,
+        after_id=cursor
     )
     
-    return ReservoirForecastList(items=items, total=total, page=page, page_size=page_size)
+    return ModelJSONResponse(ReservoirForecastList.model_construct(
+        items=RESERVOIR_FORECAST_LIST.validate_python(items[:page_size], from_attributes=True), total=total, page=page, page_size=page_size,
+        has_more=len(items) > page_size,
+        next_cursor=items[page_size - 1].id if len(items) > page_size else None
+    ))
 
 
 @router.get("/forecasts/{forecast_id}", response_model=ReservoirForecastResponse)
-async def get_forecast(
-    forecast_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+def get_forecast(
+    forecast: ReservoirForecast = Depends(owned_forecast(READ_ROLES, VIEW_ALL_ROLES))
 ):
     """Get specific forecast"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    forecast = reservoir_service.get_reservoir_forecast(forecast_id)
-    
-    if not forecast:
-        raise HTTPException(status_code=404, detail="Forecast not found")
-    
-    # Check ownership unless admin/manager
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] and forecast.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     return forecast
 
 
 @router.put("/forecasts/{forecast_id}/publish", response_model=ReservoirForecastResponse)
-async def publish_forecast(
-    forecast_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+def publish_forecast(
+    forecast: ReservoirForecast = Depends(owned_forecast(OWNER_ROLES, MODIFY_ALL_ROLES)),
+    db: Session = Depends(get_db)
 ):
     """Publish a forecast"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    forecast = reservoir_service.get_reservoir_forecast(forecast_id)
-    
-    if not forecast:
-        raise HTTPException(status_code=404, detail="Forecast not found")
-    
-    # Check ownership unless admin
-    if current_user.role != UserRole.ADMIN and forecast.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    published_forecast = reservoir_service.publish_forecast(forecast_id)
+    published_forecast = reservoir_service.publish_forecast(db, forecast.id)
     return published_forecast
 
 
 # Warning Management Endpoints
-@router.get("/warnings", response_model=ReservoirWarningList)
-async def get_warning_list(
+@router.get("/warnings", response_model=None, responses={200: {"model": ReservoirWarningList}})
+def get_warning_list(
     forecast_id: Optional[str] = Query(None),
     severity_level: Optional[WarningLevel] = Query(None),
     is_acknowledged: Optional[bool] = Query(None),
     warning_type: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; when set, page is ignored"),
+    exact_count: bool = Query(False),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
+) -> ModelJSONResponse:
     """Get list of warnings"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
     skip = (page - 1) * page_size
-    reservoir_service = ReservoirService(db)
-    
     items, total = reservoir_service.get_warning_list(
+        db,
         forecast_id=forecast_id,
         severity_level=severity_level,
         is_acknowledged=is_acknowledged,
         warning_type=warning_type,
         skip=skip,
-        limit=page_size
+        limit=page_size + 1,  # One extra row tells us whether another page follows
+        exact_count=exact_count,
+        after_id=cursor
     )
     
-    return ReservoirWarningList(items=items, total=total, page=page, page_size=page_size)
+    return ModelJSONResponse(ReservoirWarningList.model_construct(
+        items=RESERVOIR_WARNING_LIST.validate_python(items[:page_size], from_attributes=True), total=total, page=page, page_size=page_size,
+        has_more=len(items) > page_size,
+        next_cursor=items[page_size - 1].id if len(items) > page_size else None
+    ))
 
 
 @router.post("/warnings/acknowledge")
-async def acknowledge_warnings(
+def acknowledge_warnings(
     acknowledgment_request: WarningAcknowledgmentRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
 ):
     """Acknowledge multiple warnings"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    acknowledged_warnings = reservoir_service.acknowledge_multiple_warnings(
-        acknowledgment_request.warning_ids,
+    acknowledged_ids = reservoir_service.acknowledge_multiple_warnings(
+        db,
+        [str(warning_id) for warning_id in acknowledgment_request.warning_ids],
         current_user.id
     )
     
     return {
-        "message": f"Acknowledged {len(acknowledged_warnings)} warnings",
-        "acknowledged_warnings": [w.id for w in acknowledged_warnings]
+        "message": f"Acknowledged {len(acknowledged_ids)} warnings",
+        "acknowledged_warnings": acknowledged_ids
     }
 
 
-@router.get("/warnings/unacknowledged", response_model=List[ReservoirWarningResponse])
-async def get_unacknowledged_warnings(
+@router.get("/warnings/unacknowledged", response_model=None, responses={200: {"model": ReservoirWarningCursorPage}})
+def get_unacknowledged_warnings(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get unacknowledged warnings for current user"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
+) -> ReservoirWarningCursorPage:
+    """Get unacknowledged warnings for current user, one page at a time"""
     # Only show warnings from own forecasts unless admin/manager
-    user_filter = current_user.id if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] else None
+    user_filter = current_user.id if current_user.role not in VIEW_ALL_ROLES else None
+    
+    # Fetch one extra row to know whether another page follows
+    warnings = reservoir_service.get_unacknowledged_warnings(db, user_filter, limit=limit + 1, cursor=cursor)
+    next_cursor = encode_warning_cursor(warnings[limit - 1]) if len(warnings) > limit else None
     
-    warnings = reservoir_service.get_unacknowledged_warnings(user_filter)
-    return warnings
+    return ReservoirWarningCursorPage(items=warnings[:limit], next_cursor=next_cursor)
 
 
 # Prediction Session Endpoints
 @router.get("/prediction-sessions", response_model=PredictionSessionList)
 async def get_prediction_sessions(
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    page_size: int = Query(20, ge=1, le=100)
 ):
     """Get prediction sessions"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
     # For simplicity, return empty list - this would need pagination implementation in service
     return PredictionSessionList(items=[], total=0, page=page, page_size=page_size)
 
 
 @router.get("/prediction-sessions/{session_id}", response_model=PredictionSessionResponse)
-async def get_prediction_session(
-    session_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+def get_prediction_session(
+    session: PredictionSession = Depends(owned_prediction_session(READ_ROLES, VIEW_ALL_ROLES))
 ):
     """Get specific prediction session"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    session = reservoir_service.get_prediction_session(session_id)
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Prediction session not found")
-    
-    # Check ownership unless admin/manager
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] and session.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     return session
 
 
 @router.get("/dashboard/summary")
-async def get_dashboard_summary(
+def get_dashboard_summary(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_reservoir_roles(READ_ROLES))
 ):
     """Get dashboard summary for reservoir engineer"""
-    validate_user_role(current_user, [UserRole.RESERVOIR_ENGINEER, UserRole.GEOSCIENTIST, UserRole.MANAGER, UserRole.ADMIN])
-    
-    reservoir_service = ReservoirService(db)
-    
-    # Get recent forecasts
-    recent_forecasts = reservoir_service.get_recent_forecasts(
-        user_id=current_user.id if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] else None
-    )
-    
-    # Get unacknowledged warnings
-    unacknowledged_warnings = reservoir_service.get_unacknowledged_warnings(
-        user_id=current_user.id if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER] else None
+    user_filter = current_user.id if current_user.role not in VIEW_ALL_ROLES else None
+    
+    # Admins and managers see the same unfiltered summary, so they share one entry
+    with _dashboard_cache_lock:
+        cached_summary = _dashboard_cache.get(user_filter)
+    if cached_summary is not None:
+        return cached_summary
+    
+    # Get recent forecasts (count in SQL, load only the latest 5)
+    recent_forecasts_count = reservoir_service.count_recent_forecasts(db, user_id=user_filter)
+    recent_forecasts = reservoir_service.get_recent_forecasts(db, user_id=user_filter, limit=5)
+    
+    # Get unacknowledged warning counts and the 5 most urgent warnings
+    warning_counts = reservoir_service.get_dashboard_counts(db, user_id=user_filter)
+    urgent_warnings = reservoir_service.get_unacknowledged_warnings(
+        db,
+        user_id=user_filter,
+        severity_levels=[WarningLevelModel.HIGH, WarningLevelModel.CRITICAL],
+        limit=5
     )
     
-    return {
-        'recent_forecasts_count': len(recent_forecasts),
-        'unacknowledged_warnings_count': len(unacknowledged_warnings),
-        'critical_warnings_count': len([w for w in unacknowledged_warnings if w.severity_level == WarningLevel.CRITICAL]),
-        'recent_forecasts': recent_forecasts[:5],  # Latest 5
-        'urgent_warnings': [w for w in unacknowledged_warnings if w.severity_level in [WarningLevel.HIGH, WarningLevel.CRITICAL]][:5]
+    # Convert rows to schemas so the cached summary does not hold session-bound objects
+    summary = {
+        'recent_forecasts_count': recent_forecasts_count,
+        'unacknowledged_warnings_count': warning_counts['unacknowledged_warnings_count'],
+        'critical_warnings_count': warning_counts['critical_warnings_count'],
+        'recent_forecasts': RESERVOIR_FORECAST_LIST.validate_python(recent_forecasts, from_attributes=True),  # Latest 5
+        'urgent_warnings': RESERVOIR_WARNING_LIST.validate_python(urgent_warnings, from_attributes=True)
     }
+    
+    with _dashboard_cache_lock:
+        _dashboard_cache[user_filter] = summary
+    
+    return summary
@@ -1,24 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update, func
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Literal
 import json
+from datetime import datetime
 
-from app.database.config import get_db
-from app.auth.dependencies import get_current_user
+from app.database.config import get_db, get_async_db, SessionLocal
+from app.auth.dependencies import get_current_user, get_current_user_async
 from app.models.user import User
+from app.models.seismic import SeismicAnalysis as SeismicAnalysisModel, SeismicSession as SeismicSessionModel
 from app.schemas.seismic import (
     SeismicDataset, SeismicDatasetCreate, SeismicDatasetUpdate,
     SeismicInterpretation, SeismicInterpretationCreate, SeismicInterpretationUpdate,
     SeismicAnalysis, SeismicAnalysisCreate, SeismicAnalysisUpdate,
     SeismicSession, SeismicSessionCreate, SeismicSessionUpdate,
+    SeismicAnalysisPage, SeismicInterpretationPage, SeismicSessionPage,
     SeismicUploadResponse, ProcessingParameters, VisualizationSettings
 )
 from app.services.seismic_service import (
     SeismicDataService, SeismicAnalysisService, 
-    SeismicInterpretationService, SeismicVisualizationService
+    SeismicInterpretationService, SeismicVisualizationService,
+    load_strategy, keyset_page, split_page
 )
+from app.tasks.seismic_tasks import process_seismic_analysis
+from app.utils.orjson_response import ORJSONResponse
 
-router = APIRouter(prefix="/api/v1/seismic", tags=["seismic"])
+router = APIRouter(prefix="/api/v1/seismic", tags=["seismic"], default_response_class=ORJSONResponse)
+
+# Enumerated query values; validated by set membership rather than a regex
+SliceType = Literal["inline", "crossline", "time"]
+ExportFormat = Literal["segy", "hdf5", "csv"]
+
+def not_modified(request: Request, response: Response, version: datetime) -> bool:
+    """Tag the response with a weak ETag for `version` and report whether the client already has it"""
+    etag = f'W/"{version.timestamp():.6f}"'
+    response.headers["ETag"] = etag
+    return request.headers.get("if-none-match") == etag
 
 # Initialize services
 data_service = SeismicDataService()
@@ -40,7 +59,6 @@ async def upload_seismic_dataset(
     """Upload a new seismic dataset"""
     
     # Parse acquisition date if provided
-    from datetime import datetime
     parsed_date = None
     if acquisition_date:
         try:
@@ -74,27 +92,31 @@ async def upload_seismic_dataset(
     )
 
 @router.get("/datasets", response_model=List[SeismicDataset])
-def get_seismic_datasets(
+async def get_seismic_datasets(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     user_only: bool = Query(False),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get list of seismic datasets"""
     user_id = current_user.id if user_only else None
-    return data_service.get_datasets(db=db, user_id=user_id, skip=skip, limit=limit)
+    return await data_service.get_datasets(db=db, user_id=user_id, skip=skip, limit=limit)
 
 @router.get("/datasets/{dataset_id}", response_model=SeismicDataset)
-def get_seismic_dataset(
+async def get_seismic_dataset(
     dataset_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get a specific seismic dataset"""
-    dataset = data_service.get_dataset(db=db, dataset_id=dataset_id)
+    dataset = await data_service.get_dataset_cached(db=db, dataset_id=dataset_id)
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    if not_modified(request, response, dataset.updated_at):
+        return Response(status_code=304, headers=response.headers)
     return dataset
 
 @router.put("/datasets/{dataset_id}", response_model=SeismicDataset)
@@ -130,52 +152,53 @@ def create_seismic_analysis(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new seismic analysis job"""
-    # Verify dataset exists
-    dataset = data_service.get_dataset(db=db, dataset_id=analysis_create.dataset_id)
-    if not dataset:
-        raise HTTPException(status_code=404, detail="Dataset not found")
-    
-    return analysis_service.create_analysis(
+    # An unknown dataset_id fails the insert's foreign key and is reported as 404
+    analysis = analysis_service.create_analysis(
         db=db, 
         analysis_create=analysis_create,
         user_id=current_user.id
     )
+    
+    # Processing runs on the Celery seismic_processing queue
+    process_seismic_analysis.delay(analysis.id)
+    
+    return analysis
 
 @router.get("/analysis/{analysis_id}", response_model=SeismicAnalysis)
-def get_seismic_analysis(
+async def get_seismic_analysis(
     analysis_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get seismic analysis status and results"""
-    from app.models.seismic import SeismicAnalysis as SeismicAnalysisModel
-    
-    analysis = db.query(SeismicAnalysisModel).filter(
-        SeismicAnalysisModel.id == analysis_id
-    ).first()
+    analysis = await db.get(SeismicAnalysisModel, analysis_id)
     
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     return analysis
 
-@router.get("/datasets/{dataset_id}/analyses", response_model=List[SeismicAnalysis])
-def get_dataset_analyses(
+@router.get("/datasets/{dataset_id}/analyses", response_model=SeismicAnalysisPage)
+async def get_dataset_analyses(
     dataset_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get all analyses for a dataset"""
-    from app.models.seismic import SeismicAnalysis as SeismicAnalysisModel
+    """Get a page of analyses for a dataset, newest first"""
+    query = select(SeismicAnalysisModel).options(*load_strategy()).where(
+        SeismicAnalysisModel.dataset_id == dataset_id
+    )
+    analyses, next_cursor = split_page(
+        (await db.scalars(keyset_page(query, SeismicAnalysisModel, cursor, limit))).all(), limit
+    )
     
-    # Verify dataset exists
-    dataset = data_service.get_dataset(db=db, dataset_id=dataset_id)
-    if not dataset:
+    # Only an empty result needs a second query to tell "no analyses" from "no dataset"
+    if not analyses and not await data_service.dataset_exists_async(db=db, dataset_id=dataset_id):
         raise HTTPException(status_code=404, detail="Dataset not found")
     
-    return db.query(SeismicAnalysisModel).filter(
-        SeismicAnalysisModel.dataset_id == dataset_id
-    ).all()
+    return {"items": analyses, "next_cursor": next_cursor}
 
 # Interpretation endpoints
 @router.post("/interpretations", response_model=SeismicInterpretation)
@@ -185,35 +208,36 @@ def create_seismic_interpretation(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new seismic interpretation"""
-    # Verify dataset exists
-    dataset = data_service.get_dataset(db=db, dataset_id=interpretation_create.dataset_id)
-    if not dataset:
-        raise HTTPException(status_code=404, detail="Dataset not found")
-    
+    # An unknown dataset_id fails the insert's foreign key and is reported as 404
     return interpretation_service.create_interpretation(
         db=db,
         interpretation_create=interpretation_create,
         user_id=current_user.id
     )
 
-@router.get("/datasets/{dataset_id}/interpretations", response_model=List[SeismicInterpretation])
-def get_dataset_interpretations(
+@router.get("/datasets/{dataset_id}/interpretations", response_model=SeismicInterpretationPage)
+async def get_dataset_interpretations(
     dataset_id: int,
     interpretation_type: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get interpretations for a dataset"""
-    # Verify dataset exists
-    dataset = data_service.get_dataset(db=db, dataset_id=dataset_id)
-    if not dataset:
-        raise HTTPException(status_code=404, detail="Dataset not found")
-    
-    return interpretation_service.get_interpretations(
+    """Get a page of interpretations for a dataset, newest first"""
+    interpretations, next_cursor = await interpretation_service.get_interpretations(
         db=db,
         dataset_id=dataset_id,
-        interpretation_type=interpretation_type
+        interpretation_type=interpretation_type,
+        cursor=cursor,
+        limit=limit
     )
+    
+    # Only an empty result needs a second query to tell "no interpretations" from "no dataset"
+    if not interpretations and not await data_service.dataset_exists_async(db=db, dataset_id=dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    return {"items": interpretations, "next_cursor": next_cursor}
 
 @router.put("/interpretations/{interpretation_id}", response_model=SeismicInterpretation)
 def update_seismic_interpretation(
@@ -252,7 +276,7 @@ async def generate_3d_visualization(
 @router.get("/datasets/{dataset_id}/slice")
 async def get_seismic_slice(
     dataset_id: int,
-    slice_type: str = Query(..., regex="^(inline|crossline|time)$"),
+    slice_type: SliceType = Query(...),
     slice_position: float = Query(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -270,8 +294,7 @@ async def get_seismic_slice(
         "slice_position": slice_position,
         "image_url": f"/api/v1/seismic/datasets/{dataset_id}/slice/{slice_type}/{slice_position}",
         "metadata": {
-            "dimensions": [dataset.max_inline - dataset.min_inline + 1, 
-                         dataset.max_crossline - dataset.min_crossline + 1],
+            "dimensions": [dataset.inline_count, dataset.crossline_count],
             "sample_rate": dataset.sample_rate
         }
     }
@@ -284,8 +307,6 @@ def create_seismic_session(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new seismic analysis session"""
-    from app.models.seismic import SeismicSession as SeismicSessionModel
-    
     session = SeismicSessionModel(
         user_id=current_user.id,
         session_name=session_create.session_name,
@@ -303,30 +324,46 @@ def create_seismic_session(
     
     return session
 
-@router.get("/sessions", response_model=List[SeismicSession])
-def get_seismic_sessions(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/sessions", response_model=SeismicSessionPage)
+async def get_seismic_sessions(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get user's seismic analysis sessions"""
-    from app.models.seismic import SeismicSession as SeismicSessionModel
-    
-    return db.query(SeismicSessionModel).filter(
+    """Get a page of the user's seismic analysis sessions, newest first"""
+    query = select(SeismicSessionModel).options(*load_strategy()).where(
         SeismicSessionModel.user_id == current_user.id
-    ).all()
+    )
+    sessions, next_cursor = split_page(
+        (await db.scalars(keyset_page(query, SeismicSessionModel, cursor, limit))).all(), limit
+    )
+    return {"items": sessions, "next_cursor": next_cursor}
+
+def touch_session_last_accessed(session_id: int):
+    """Record a session read after the response, in a short-lived session of its own"""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SeismicSessionModel)
+            .where(SeismicSessionModel.id == session_id)
+            .values(last_accessed=func.now())
+        )
+        db.commit()
+    finally:
+        db.close()
 
-@router.get("/sessions/{session_id}", response_model=SeismicSession)
+@router.get("/sessions/{session_id}", response_model=SeismicSession, response_model_exclude={"last_accessed"})
 def get_seismic_session(
     session_id: int,
+    background_tasks: BackgroundTasks,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific seismic session"""
-    from app.models.seismic import SeismicSession as SeismicSessionModel
-    
-    session = db.query(SeismicSessionModel).filter(
-        SeismicSessionModel.id == session_id
-    ).first()
+    session = db.get(SeismicSessionModel, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -335,19 +372,19 @@ def get_seismic_session(
     if session.user_id != current_user.id and not session.is_shared:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Update last accessed time
-    from datetime import datetime
-    session.last_accessed = datetime.now()
-    db.commit()
+    # Update last accessed time once the response has been sent
+    background_tasks.add_task(touch_session_last_accessed, session_id)
     
+    # Sessions have no update path, and last_accessed is left out of this representation since every read bumps it
+    if not_modified(request, response, session.created_at):
+        return Response(status_code=304, headers=response.headers)
     return session
 
 # Processing algorithms endpoints
 @router.post("/algorithms/noise-reduction")
-async def apply_noise_reduction(
+def apply_noise_reduction(
     dataset_id: int,
     parameters: ProcessingParameters,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -360,17 +397,21 @@ async def apply_noise_reduction(
         parameters=parameters.dict()
     )
     
-    return analysis_service.create_analysis(
+    analysis = analysis_service.create_analysis(
         db=db,
         analysis_create=analysis_create,
         user_id=current_user.id
     )
+    
+    # Processing runs on the Celery seismic_processing queue
+    process_seismic_analysis.delay(analysis.id)
+    
+    return analysis
 
 @router.post("/algorithms/migration")
-async def apply_migration(
+def apply_migration(
     dataset_id: int,
     parameters: ProcessingParameters,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -383,17 +424,21 @@ async def apply_migration(
         parameters=parameters.dict()
     )
     
-    return analysis_service.create_analysis(
+    analysis = analysis_service.create_analysis(
         db=db,
         analysis_create=analysis_create,
         user_id=current_user.id
     )
+    
+    # Processing runs on the Celery seismic_processing queue
+    process_seismic_analysis.delay(analysis.id)
+    
+    return analysis
 
 @router.post("/algorithms/attributes")
-async def compute_attributes(
+def compute_attributes(
     dataset_id: int,
     parameters: ProcessingParameters,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -406,17 +451,22 @@ async def compute_attributes(
         parameters=parameters.dict()
     )
     
-    return analysis_service.create_analysis(
+    analysis = analysis_service.create_analysis(
         db=db,
         analysis_create=analysis_create,
         user_id=current_user.id
     )
+    
+    # Processing runs on the Celery seismic_processing queue
+    process_seismic_analysis.delay(analysis.id)
+    
+    return analysis
 
 # Data export endpoints
 @router.get("/datasets/{dataset_id}/export")
 async def export_seismic_data(
     dataset_id: int,
-    export_format: str = Query(..., regex="^(segy|hdf5|csv)$"),
+    export_format: ExportFormat = Query(...),
     include_interpretations: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -437,3 +487,22 @@ async def export_seismic_data(
     }
     
     return export_info
+
+@router.get("/datasets/{dataset_id}/download/{export_format}")
+def download_seismic_export(
+    dataset_id: int,
+    export_format: ExportFormat,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream a seismic dataset export trace by trace"""
+    dataset = data_service.get_dataset(db=db, dataset_id=dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # Sync generator; Starlette iterates it in the threadpool as the client reads
+    return StreamingResponse(
+        data_service.iter_export(dataset, export_format),
+        media_type="text/csv" if export_format == "csv" else "application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{dataset.id}.{export_format}"'}
+    )
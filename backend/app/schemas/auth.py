@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
+from typing import Optional, List
 from datetime import datetime
 from app.models.user import UserRole
 
@@ -32,8 +32,11 @@ class UserResponse(UserBase):
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Compiled list validator for pages of User rows
+USER_RESPONSE_LIST = TypeAdapter(List[UserResponse])
 
 
 class UserLogin(BaseModel):
@@ -84,3 +87,7 @@ class PasswordResetConfirm(BaseModel):
 class ChangePassword(BaseModel):
     current_password: str
     new_password: str
+
+
+class UserBatchRequest(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=500)
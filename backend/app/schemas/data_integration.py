@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+import orjson
 
 
 class FileTypeEnum(str, Enum):
@@ -82,8 +83,7 @@ class FileMetadataResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DataFileResponse(BaseModel):
@@ -112,16 +112,17 @@ class DataFileResponse(BaseModel):
 
     @validator('tags', pre=True)
     def parse_tags(cls, v):
-        if isinstance(v, str):
-            import json
+        # JSONB columns arrive already decoded; only text payloads need parsing
+        if isinstance(v, (dict, list)):
+            return v
+        if isinstance(v, (str, bytes)):
             try:
-                return json.loads(v)
-            except json.JSONDecodeError:
+                return orjson.loads(v)
+            except orjson.JSONDecodeError:
                 return []
         return v or []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FileAccessLogResponse(BaseModel):
@@ -133,8 +134,7 @@ class FileAccessLogResponse(BaseModel):
     user_agent: Optional[str]
     timestamp: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FileShareResponse(BaseModel):
@@ -147,8 +147,7 @@ class FileShareResponse(BaseModel):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DataIntegrationJobResponse(BaseModel):
@@ -165,16 +164,17 @@ class DataIntegrationJobResponse(BaseModel):
 
     @validator('config', 'result', pre=True)
     def parse_json_fields(cls, v):
-        if isinstance(v, str):
-            import json
+        # JSONB columns arrive already decoded; only text payloads need parsing
+        if isinstance(v, (dict, list)):
+            return v
+        if isinstance(v, (str, bytes)):
             try:
-                return json.loads(v)
-            except json.JSONDecodeError:
+                return orjson.loads(v)
+            except orjson.JSONDecodeError:
                 return {}
         return v or {}
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Upload response schemas
@@ -216,3 +216,7 @@ class ProcessingSummary(BaseModel):
     failed_uploads: int
     files_in_processing: int
     recent_activity: List[FileAccessLogResponse]
+
+
+# Compiled list validator; validates a page of ORM rows in one call with validate_python(rows, from_attributes=True)
+DATA_FILE_RESPONSE_LIST = TypeAdapter(List[DataFileResponse])
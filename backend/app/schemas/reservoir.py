@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, UUID4, TypeAdapter, SkipValidation
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -30,6 +30,10 @@ class WarningLevel(str, Enum):
     CRITICAL = "critical"
 
 
+# Opaque JSON columns on responses: the stored dict is passed through as-is rather than walked and copied
+JSONBlob = SkipValidation[Dict[str, Any]]
+
+
 # Base schemas for creation
 class ReservoirDataCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -136,8 +140,8 @@ class ReservoirDataResponse(BaseModel):
     data_type: ReservoirDataType
     file_path: str
     file_size: Optional[int] = None
-    metadata: Optional[Dict[str, Any]] = None
-    location_data: Optional[Dict[str, Any]] = None
+    metadata: Optional[JSONBlob] = None
+    location_data: Optional[JSONBlob] = None
     time_range_start: Optional[datetime] = None
     time_range_end: Optional[datetime] = None
     uploaded_by: str
@@ -145,8 +149,7 @@ class ReservoirDataResponse(BaseModel):
     updated_at: Optional[datetime] = None
     is_processed: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class ReservoirSimulationResponse(BaseModel):
@@ -154,21 +157,20 @@ class ReservoirSimulationResponse(BaseModel):
     name: str
     description: Optional[str] = None
     reservoir_data_id: str
-    simulation_parameters: Dict[str, Any]
+    simulation_parameters: JSONBlob
     extraction_scenario: str
     status: SimulationStatus
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
     results_path: Optional[str] = None
-    results_summary: Optional[Dict[str, Any]] = None
-    visualization_data: Optional[Dict[str, Any]] = None
+    results_summary: Optional[JSONBlob] = None
+    visualization_data: Optional[JSONBlob] = None
     created_by: str
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class ReservoirForecastResponse(BaseModel):
@@ -177,11 +179,11 @@ class ReservoirForecastResponse(BaseModel):
     description: Optional[str] = None
     simulation_id: str
     model_type: str
-    model_parameters: Optional[Dict[str, Any]] = None
-    training_data_info: Optional[Dict[str, Any]] = None
-    model_accuracy_metrics: Optional[Dict[str, Any]] = None
-    forecast_data: Dict[str, Any]
-    confidence_intervals: Optional[Dict[str, Any]] = None
+    model_parameters: Optional[JSONBlob] = None
+    training_data_info: Optional[JSONBlob] = None
+    model_accuracy_metrics: Optional[JSONBlob] = None
+    forecast_data: JSONBlob
+    confidence_intervals: Optional[JSONBlob] = None
     forecast_horizon_days: int
     predicted_production_rate: Optional[float] = None
     predicted_reservoir_pressure: Optional[float] = None
@@ -191,8 +193,7 @@ class ReservoirForecastResponse(BaseModel):
     published_at: Optional[datetime] = None
     created_by: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class ReservoirWarningResponse(BaseModel):
@@ -202,8 +203,8 @@ class ReservoirWarningResponse(BaseModel):
     severity_level: WarningLevel
     title: str
     description: str
-    trigger_conditions: Dict[str, Any]
-    recommended_actions: Optional[Dict[str, Any]] = None
+    trigger_conditions: JSONBlob
+    recommended_actions: Optional[JSONBlob] = None
     predicted_occurrence_date: Optional[datetime] = None
     confidence_score: Optional[float] = None
     is_acknowledged: bool
@@ -212,8 +213,7 @@ class ReservoirWarningResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class PredictionSessionResponse(BaseModel):
@@ -221,12 +221,12 @@ class PredictionSessionResponse(BaseModel):
     session_name: str
     description: Optional[str] = None
     data_sources: List[str]
-    analysis_parameters: Dict[str, Any]
-    preprocessing_steps: Optional[Dict[str, Any]] = None
-    ml_pipeline_config: Dict[str, Any]
-    feature_engineering_steps: Optional[Dict[str, Any]] = None
-    model_selection_criteria: Optional[Dict[str, Any]] = None
-    session_results: Optional[Dict[str, Any]] = None
+    analysis_parameters: JSONBlob
+    preprocessing_steps: Optional[JSONBlob] = None
+    ml_pipeline_config: JSONBlob
+    feature_engineering_steps: Optional[JSONBlob] = None
+    model_selection_criteria: Optional[JSONBlob] = None
+    session_results: Optional[JSONBlob] = None
     generated_forecasts: Optional[List[str]] = None
     generated_warnings: Optional[List[str]] = None
     started_at: datetime
@@ -235,8 +235,7 @@ class PredictionSessionResponse(BaseModel):
     created_by: str
     shared_with_users: Optional[List[str]] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 # Special request schemas for complex operations
@@ -261,37 +260,50 @@ class SimulationComparisonRequest(BaseModel):
 
 class WarningAcknowledgmentRequest(BaseModel):
     """Schema for acknowledging warnings"""
-    warning_ids: List[str] = Field(..., min_items=1)
+    warning_ids: List[UUID4] = Field(..., min_length=1, max_length=500)
     acknowledgment_note: Optional[str] = None
 
 
 # List response schemas
 class ReservoirDataList(BaseModel):
     items: List[ReservoirDataResponse]
-    total: int
+    total: Optional[int] = None  # Only computed when exact_count is requested
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to continue after this page
 
 
 class ReservoirSimulationList(BaseModel):
     items: List[ReservoirSimulationResponse]
-    total: int
+    total: Optional[int] = None  # Only computed when exact_count is requested
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to continue after this page
 
 
 class ReservoirForecastList(BaseModel):
     items: List[ReservoirForecastResponse]
-    total: int
+    total: Optional[int] = None  # Only computed when exact_count is requested
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to continue after this page
 
 
 class ReservoirWarningList(BaseModel):
     items: List[ReservoirWarningResponse]
-    total: int
+    total: Optional[int] = None  # Only computed when exact_count is requested
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to continue after this page
+
+
+class ReservoirWarningCursorPage(BaseModel):
+    items: List[ReservoirWarningResponse]
+    next_cursor: Optional[str] = None
 
 
 class PredictionSessionList(BaseModel):
@@ -299,3 +311,10 @@ class PredictionSessionList(BaseModel):
     total: int
     page: int
     page_size: int
+
+
+# Compiled list validators; validate a page of ORM rows in one call with validate_python(rows, from_attributes=True)
+RESERVOIR_DATA_LIST = TypeAdapter(List[ReservoirDataResponse])
+RESERVOIR_SIMULATION_LIST = TypeAdapter(List[ReservoirSimulationResponse])
+RESERVOIR_FORECAST_LIST = TypeAdapter(List[ReservoirForecastResponse])
+RESERVOIR_WARNING_LIST = TypeAdapter(List[ReservoirWarningResponse])
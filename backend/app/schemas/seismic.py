@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, SkipValidation, validator
+from typing import Optional, List, Dict, Any, Annotated
 from datetime import datetime
+from dataclasses import dataclass
 from enum import Enum
 
 class ProcessingStatus(str, Enum):
@@ -29,6 +30,9 @@ class AnalysisType(str, Enum):
     FREQUENCY_ANALYSIS = "frequency_analysis"
     COHERENCE_ANALYSIS = "coherence_analysis"
 
+# Shared field types
+HexColor = Annotated[str, StringConstraints(pattern=r"^#[0-9A-Fa-f]{6}$")]
+
 # Base schemas
 class SeismicDatasetBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -78,13 +82,14 @@ class SeismicDataset(SeismicDatasetBase):
     id: int
     file_path: str
     file_size: Optional[int] = None
+    inline_count: Optional[int] = None
+    crossline_count: Optional[int] = None
     processing_status: ProcessingStatus
     uploaded_by: int
     uploaded_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 # Interpretation schemas
 class SeismicInterpretationBase(BaseModel):
@@ -92,7 +97,7 @@ class SeismicInterpretationBase(BaseModel):
     description: Optional[str] = None
     interpretation_type: InterpretationType
     geometry_data: Optional[Dict[str, Any]] = None
-    color: Optional[str] = Field("#FF0000", regex=r"^#[0-9A-Fa-f]{6}$")
+    color: Optional[HexColor] = "#FF0000"
     opacity: Optional[float] = Field(1.0, ge=0.0, le=1.0)
     thickness: Optional[float] = Field(1.0, gt=0.0)
     confidence_level: Optional[float] = Field(0.5, ge=0.0, le=1.0)
@@ -106,7 +111,7 @@ class SeismicInterpretationUpdate(BaseModel):
     description: Optional[str] = None
     interpretation_type: Optional[InterpretationType] = None
     geometry_data: Optional[Dict[str, Any]] = None
-    color: Optional[str] = Field(None, regex=r"^#[0-9A-Fa-f]{6}$")
+    color: Optional[HexColor] = None
     opacity: Optional[float] = Field(None, ge=0.0, le=1.0)
     thickness: Optional[float] = Field(None, gt=0.0)
     confidence_level: Optional[float] = Field(None, ge=0.0, le=1.0)
@@ -121,8 +126,7 @@ class SeismicInterpretation(SeismicInterpretationBase):
     updated_at: datetime
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 # Analysis schemas
 class SeismicAnalysisBase(BaseModel):
@@ -146,7 +150,7 @@ class SeismicAnalysis(SeismicAnalysisBase):
     id: int
     dataset_id: int
     result_file_path: Optional[str] = None
-    result_metadata: Optional[Dict[str, Any]] = None
+    result_metadata: Optional[SkipValidation[Dict[str, Any]]] = None  # Opaque; passed through unvalidated
     algorithm_version: Optional[str] = None
     processing_time: Optional[float] = None
     cpu_usage: Optional[float] = None
@@ -159,8 +163,7 @@ class SeismicAnalysis(SeismicAnalysisBase):
     completed_at: Optional[datetime] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 # Session schemas
 class SeismicSessionBase(BaseModel):
@@ -190,8 +193,20 @@ class SeismicSession(SeismicSessionBase):
     created_at: datetime
     last_accessed: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
+# Keyset-paginated list responses; pass next_cursor back as `cursor` for the following page
+class SeismicAnalysisPage(BaseModel):
+    items: List[SeismicAnalysis]
+    next_cursor: Optional[str] = None
+
+class SeismicInterpretationPage(BaseModel):
+    items: List[SeismicInterpretation]
+    next_cursor: Optional[str] = None
+
+class SeismicSessionPage(BaseModel):
+    items: List[SeismicSession]
+    next_cursor: Optional[str] = None
 
 # Upload schemas
 class SeismicUploadResponse(BaseModel):
@@ -224,7 +239,10 @@ class VisualizationSettings(BaseModel):
     view_mode: Optional[str] = "3d"  # 2d, 3d, slice
     lighting: Optional[Dict[str, Any]] = None
 
-class InterpretationPoint(BaseModel):
+# Geometries can carry thousands of points; a slotted dataclass keeps each one small.
+# Pydantic still validates and coerces it wherever it appears in a model field.
+@dataclass(slots=True, frozen=True)
+class InterpretationPoint:
     x: float
     y: float
     z: float
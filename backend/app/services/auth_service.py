@@ -1,12 +1,49 @@
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from supabase import create_client, Client
 from gotrue.errors import AuthApiError
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User, UserSession, UserRole
 from app.schemas.auth import UserCreate, UserLogin, UserResponse
-from datetime import datetime, timedelta
-import secrets
+from datetime import datetime, timedelta, timezone
+from cachetools import TTLCache
+import asyncio
+import functools
+
+_UTC = timezone.utc
+
+# Access token -> Supabase user id, so repeat requests skip the verification round trip.
+# Bounded well below the token lifetime; sign-out evicts the entry immediately.
+TOKEN_CACHE_TTL = 60  # seconds
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+
+
+
+def _wrap_auth_errors(auth_error: str, failure: Optional[str] = None):
+    """Translate a service method's errors into the plain Exceptions the auth routes report.
+    
+    Supabase errors become "<auth_error>: <message>". Any other error rolls back the
+    method's session and, when `failure` is given, is re-raised as "<failure>: <error>".
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await method(*args, **kwargs)
+            except AuthApiError as e:
+                raise Exception(f"{auth_error}: {e.message}")
+            except Exception as e:
+                db = kwargs.get("db") or next((a for a in args if isinstance(a, Session)), None)
+                if db is not None:
+                    db.rollback()
+                if failure is None:
+                    raise
+                raise Exception(f"{failure}: {str(e)}")
+        return wrapper
+    return decorator
 
 
 class SupabaseAuthService:
@@ -19,121 +56,105 @@ class SupabaseAuthService:
         
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
     
+    def _store_session(self, db: Session, user_id: str, session) -> None:
+        """Record the user's current Supabase session, replacing any earlier one (one row per user)"""
+        values = {
+            "access_token": session.access_token,
+            "refresh_token": session.refresh_token,
+            "expires_at": datetime.fromtimestamp(session.expires_at, _UTC),
+            "is_revoked": False
+        }
+        db.execute(
+            pg_insert(UserSession)
+            .values(user_id=user_id, **values)
+            .on_conflict_do_update(index_elements=[UserSession.user_id], set_=values)
+        )
+    
+    @_wrap_auth_errors("Authentication error", "Failed to create user")
     async def sign_up(self, user_data: UserCreate, db: Session) -> Dict[str, Any]:
         """Sign up a new user with Supabase Auth"""
-        try:
-            # Create user in Supabase Auth
-            auth_response = self.supabase.auth.sign_up({
-                "email": user_data.email,
-                "password": user_data.password,
-                "options": {
-                    "data": {
-                        "full_name": user_data.full_name,
-                        "role": user_data.role.value,
-                        "department": user_data.department,
-                        "phone_number": user_data.phone_number
-                    }
+        # Create user in Supabase Auth
+        auth_response = await asyncio.to_thread(self.supabase.auth.sign_up, {
+            "email": user_data.email,
+            "password": user_data.password,
+            "options": {
+                "data": {
+                    "full_name": user_data.full_name,
+                    "role": user_data.role.value,
+                    "department": user_data.department,
+                    "phone_number": user_data.phone_number
                 }
-            })
+            }
+        })
+        
+        if auth_response.user:
+            # Determine if user is confirmed (session exists) or needs email confirmation
+            is_confirmed = auth_response.session is not None
             
-            if auth_response.user:
-                # Determine if user is confirmed (session exists) or needs email confirmation
-                is_confirmed = auth_response.session is not None
-                
-                # Create user record in our database
-                db_user = User(
-                    id=auth_response.user.id,
-                    email=user_data.email,
-                    full_name=user_data.full_name,
-                    role=user_data.role,
-                    department=user_data.department,
-                    phone_number=user_data.phone_number,
-                    is_active=is_confirmed  # Only active if email is confirmed
-                )
-                
-                db.add(db_user)
-                db.commit()
-                db.refresh(db_user)
-                
-                # Store session if user is confirmed
-                session_record = None
-                if auth_response.session:
-                    session_record = UserSession(
-                        id=secrets.token_urlsafe(32),
-                        user_id=auth_response.user.id,
-                        access_token=auth_response.session.access_token,
-                        refresh_token=auth_response.session.refresh_token,
-                        expires_at=datetime.fromtimestamp(auth_response.session.expires_at)
-                    )
-                    db.add(session_record)
-                    db.commit()
-                
-                return {
-                    "user": auth_response.user,
-                    "session": auth_response.session,
-                    "db_user": db_user,
-                    "requires_confirmation": not is_confirmed,
-                    "message": "Please check your email to confirm your account" if not is_confirmed else "User created successfully"
-                }
+            # Create user record in our database
+            db_user = User(
+                id=auth_response.user.id,
+                email=user_data.email,
+                full_name=user_data.full_name,
+                role=user_data.role,
+                department=user_data.department,
+                phone_number=user_data.phone_number,
+                is_active=is_confirmed  # Only active if email is confirmed
+            )
             
-            raise Exception("Failed to create user")
+            db.add(db_user)
             
-        except AuthApiError as e:
-            raise Exception(f"Authentication error: {e.message}")
-        except Exception as e:
-            db.rollback()
-            raise Exception(f"Failed to create user: {str(e)}")
+            # Store session if user is confirmed; written in the same transaction as the user
+            if auth_response.session:
+                self._store_session(db, auth_response.user.id, auth_response.session)
+            
+            db.commit()
+            
+            return {
+                "user": auth_response.user,
+                "session": auth_response.session,
+                "db_user": db_user,
+                "requires_confirmation": not is_confirmed,
+                "message": "Please check your email to confirm your account" if not is_confirmed else "User created successfully"
+            }
+        
+        raise Exception("Failed to create user")
     
+    @_wrap_auth_errors("Authentication error", "Login failed")
     async def sign_in(self, credentials: UserLogin, db: Session) -> Dict[str, Any]:
         """Sign in user with Supabase Auth"""
-        try:
-            auth_response = self.supabase.auth.sign_in_with_password({
-                "email": credentials.email,
-                "password": credentials.password
-            })
-            
-            if auth_response.user and auth_response.session:
-                # Update user's last login
-                db_user = db.query(User).filter(User.id == auth_response.user.id).first()
-                if db_user:
-                    db_user.last_login = datetime.utcnow()
-                    db.commit()
-                    
-                    # Store session in database
-                    session_record = UserSession(
-                        id=secrets.token_urlsafe(32),
-                        user_id=auth_response.user.id,
-                        access_token=auth_response.session.access_token,
-                        refresh_token=auth_response.session.refresh_token,
-                        expires_at=datetime.fromtimestamp(auth_response.session.expires_at)
-                    )
-                    
-                    db.add(session_record)
-                    db.commit()
+        auth_response = await asyncio.to_thread(self.supabase.auth.sign_in_with_password, {
+            "email": credentials.email,
+            "password": credentials.password
+        })
+        
+        if auth_response.user and auth_response.session:
+            # Update user's last login
+            db_user = db.get(User, auth_response.user.id)
+            if db_user:
+                db_user.last_login = datetime.now(_UTC)
                 
-                return {
-                    "user": auth_response.user,
-                    "session": auth_response.session,
-                    "db_user": db_user
-                }
-            
-            raise Exception("Invalid credentials")
+                # Store session in database, committed together with last_login
+                self._store_session(db, auth_response.user.id, auth_response.session)
+                db.commit()
             
-        except AuthApiError as e:
-            raise Exception(f"Authentication error: {e.message}")
-        except Exception as e:
-            raise Exception(f"Login failed: {str(e)}")
+            return {
+                "user": auth_response.user,
+                "session": auth_response.session,
+                "db_user": db_user
+            }
+        
+        raise Exception("Invalid credentials")
     
     async def sign_out(self, access_token: str, db: Session) -> bool:
         """Sign out user and revoke session"""
         try:
             # Sign out from Supabase
-            self.supabase.auth.sign_out()
+            await asyncio.to_thread(self.supabase.auth.sign_out)
+            _token_cache.pop(access_token, None)
             
             # Revoke session in database
-            session = db.query(UserSession).filter(
-                UserSession.access_token == access_token
-            ).first()
+            session = db.scalar(select(UserSession).where(UserSession.access_token == access_token).limit(1))
             
             if session:
                 session.is_revoked = True
@@ -145,116 +166,125 @@ class SupabaseAuthService:
             print(f"Sign out error: {e}")
             return False
     
+    async def _resolve_user_id(self, access_token: str) -> Optional[str]:
+        """User ID an access token belongs to, or None when Supabase rejects it"""
+        user_id = _token_cache.get(access_token)
+        if user_id is None:
+            # Verify token with Supabase off the event loop; the client call blocks
+            user_response = await asyncio.to_thread(self.supabase.auth.get_user, access_token)
+            if not user_response.user:
+                return None
+            user_id = _token_cache[access_token] = user_response.user.id
+        return user_id
+    
     async def get_current_user(self, access_token: str, db: Session) -> Optional[User]:
         """Get current user from access token"""
         try:
-            # Verify token with Supabase
-            user_response = self.supabase.auth.get_user(access_token)
+            user_id = await self._resolve_user_id(access_token)
+            if user_id is None:
+                return None
             
-            if user_response.user:
-                # Get user from database
-                db_user = db.query(User).filter(
-                    User.id == user_response.user.id
-                ).first()
-                
-                return db_user
+            # Get user from database
+            return db.get(User, user_id)
             
+        except Exception as e:
+            print(f"Get current user error: {e}")
             return None
+    
+    async def get_current_user_async(self, access_token: str, db: AsyncSession) -> Optional[User]:
+        """Get current user from access token through an AsyncSession"""
+        try:
+            user_id = await self._resolve_user_id(access_token)
+            if user_id is None:
+                return None
+            
+            return await db.get(User, user_id)
             
         except Exception as e:
             print(f"Get current user error: {e}")
             return None
     
+    @_wrap_auth_errors("Token refresh error")
     async def refresh_token(self, refresh_token: str, db: Session) -> Dict[str, Any]:
         """Refresh access token"""
-        try:
-            auth_response = self.supabase.auth.refresh_session(refresh_token)
-            
-            if auth_response.session:
-                # Update session in database
-                session = db.query(UserSession).filter(
-                    UserSession.refresh_token == refresh_token
-                ).first()
-                
-                if session:
-                    session.access_token = auth_response.session.access_token
-                    session.refresh_token = auth_response.session.refresh_token
-                    session.expires_at = datetime.fromtimestamp(auth_response.session.expires_at)
-                    db.commit()
-                
-                return {
-                    "session": auth_response.session,
-                    "user": auth_response.user
-                }
-            
-            raise Exception("Failed to refresh token")
+        auth_response = await asyncio.to_thread(self.supabase.auth.refresh_session, refresh_token)
+        
+        if auth_response.session:
+            # Rotate the stored tokens in place
+            rotated = db.execute(
+                update(UserSession)
+                .where(UserSession.refresh_token == refresh_token)
+                .values(
+                    access_token=auth_response.session.access_token,
+                    refresh_token=auth_response.session.refresh_token,
+                    expires_at=datetime.fromtimestamp(auth_response.session.expires_at, _UTC)
+                )
+            )
+            if rotated.rowcount == 0:
+                # A later sign-in replaced this user's one session row, so the token is no longer ours
+                raise Exception("Session is no longer active; sign in again")
+            db.commit()
             
-        except AuthApiError as e:
-            raise Exception(f"Token refresh error: {e.message}")
+            return {
+                "session": auth_response.session,
+                "user": auth_response.user
+            }
+        
+        raise Exception("Failed to refresh token")
     
+    @_wrap_auth_errors("Email confirmation error", "Failed to confirm email")
     async def confirm_email(self, token: str, db: Session) -> Dict[str, Any]:
         """Confirm user email with verification token"""
-        try:
-            # Verify email with Supabase
-            auth_response = self.supabase.auth.verify_otp({
-                'token_hash': token,
-                'type': 'email'
-            })
-            
-            if auth_response.user:
-                # Activate user in our database
-                db_user = db.query(User).filter(User.id == auth_response.user.id).first()
-                if db_user:
-                    db_user.is_active = True
-                    db.commit()
-                    db.refresh(db_user)
-                
-                return {
-                    "user": auth_response.user,
-                    "session": auth_response.session,
-                    "db_user": db_user,
-                    "message": "Email confirmed successfully"
-                }
-            
-            raise Exception("Invalid confirmation token")
+        # Verify email with Supabase
+        auth_response = await asyncio.to_thread(self.supabase.auth.verify_otp, {
+            'token_hash': token,
+            'type': 'email'
+        })
+        
+        if auth_response.user:
+            # Activate user in our database
+            db_user = db.get(User, auth_response.user.id)
+            if db_user:
+                db_user.is_active = True
+                db.commit()
             
-        except AuthApiError as e:
-            raise Exception(f"Email confirmation error: {e.message}")
-        except Exception as e:
-            raise Exception(f"Failed to confirm email: {str(e)}")
-
+            return {
+                "user": auth_response.user,
+                "session": auth_response.session,
+                "db_user": db_user,
+                "message": "Email confirmed successfully"
+            }
+        
+        raise Exception("Invalid confirmation token")
+    
+    @_wrap_auth_errors("Failed to resend confirmation")
     async def resend_confirmation(self, email: str) -> bool:
         """Resend email confirmation"""
-        try:
-            self.supabase.auth.resend({
-                'type': 'signup',
-                'email': email
-            })
-            return True
-        except AuthApiError as e:
-            raise Exception(f"Failed to resend confirmation: {e.message}")
-
+        await asyncio.to_thread(self.supabase.auth.resend, {
+            'type': 'signup',
+            'email': email
+        })
+        return True
+    
+    @_wrap_auth_errors("Password reset error")
     async def reset_password(self, email: str) -> bool:
         """Send password reset email"""
-        try:
-            self.supabase.auth.reset_password_email(email)
-            return True
-        except AuthApiError as e:
-            raise Exception(f"Password reset error: {e.message}")
+        await asyncio.to_thread(self.supabase.auth.reset_password_email, email)
+        return True
     
+    async def batch_get_users(self, user_ids: List[str], db: Session) -> List[User]:
+        """Get several users by ID in one query; unknown IDs are omitted"""
+        return db.scalars(select(User).where(User.id.in_(user_ids))).all()
+    
+    @_wrap_auth_errors("Authentication error", "Failed to update user role")
     async def update_user_role(self, user_id: str, role: UserRole, db: Session) -> Optional[User]:
         """Update user role (admin only)"""
-        try:
-            db_user = db.query(User).filter(User.id == user_id).first()
-            if db_user:
-                db_user.role = role
-                db.commit()
-                db.refresh(db_user)
-                return db_user
-            return None
-        except Exception as e:
-            db.rollback()
-            raise Exception(f"Failed to update user role: {str(e)}")
+        db_user = db.get(User, user_id)
+        if db_user:
+            db_user.role = role
+            db.commit()
+            return db_user
+        return None
 
 
 # Create a global instance
@@ -1,15 +1,23 @@
 import os
+import re
 import hashlib
-import json
 import mimetypes
-from typing import List, Optional, Dict, Any, BinaryIO
-from datetime import datetime, timedelta
+import tempfile
+import time
+import logging
+from typing import List, Optional, Dict, Any, BinaryIO, Tuple, Union
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
+from functools import lru_cache
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
-from fastapi import UploadFile, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, func, select, exists, delete, update, insert
+from fastapi import UploadFile, HTTPException, status, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from supabase import create_client, Client
 
+from app.database.config import SessionLocal
 from app.models.data_integration import (
     DataFile, FileMetadata, FileAccessLog, FileShare, DataIntegrationJob,
     FileType, FileStatus, ProcessingStatus
@@ -17,46 +25,85 @@ from app.models.data_integration import (
 from app.schemas.data_integration import (
     FileUploadRequest, FileUpdateRequest, FileShareRequest, MetadataUpdateRequest,
     DataFileResponse, FileValidationResult, ProcessingSummary,
-    FileUploadResponse, FileUploadStatusResponse
+    FileUploadResponse, FileUploadStatusResponse, DATA_FILE_RESPONSE_LIST
 )
 
+logger = logging.getLogger(__name__)
+_UTC = timezone.utc
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+SHA256_HEX = re.compile(r"[0-9a-f]{64}")
+
+# Accepted MIME types per file category; "*/*" accepts anything
+ANY_MIME_TYPE = frozenset({"*/*"})
+ALLOWED_MIME_TYPES = {
+    "seismic_data": frozenset({"application/octet-stream", "text/plain", "application/x-segy"}),
+    "well_log": frozenset({"text/csv", "application/json", "text/plain"}),
+    "core_sample": frozenset({"image/jpeg", "image/png", "image/tiff", "application/pdf"}),
+    "production_data": frozenset({"text/csv", "application/json", "application/vnd.ms-excel"}),
+    "reservoir_model": frozenset({"application/octet-stream", "text/plain"}),
+    "geological_map": frozenset({"image/jpeg", "image/png", "image/tiff", "application/pdf"}),
+    "report": frozenset({"application/pdf", "application/msword", "text/plain"}),
+    "image": frozenset({"image/jpeg", "image/png", "image/tiff", "image/bmp"}),
+    "document": frozenset({"application/pdf", "application/msword", "text/plain"}),
+    "other": ANY_MIME_TYPE
+}
+
+
+@lru_cache(maxsize=1024)
+def _guess_mime(extension: str) -> Optional[str]:
+    """MIME type for a file extension, memoized since uploads repeat the same few extensions"""
+    return mimetypes.guess_type(f"file{extension}")[0]
+
+
+# (UTC epoch day, "YYYY/MM/DD") for the storage path; rebuilt only when the day rolls over
+_date_prefix = (-1, "")
+
+
+def _storage_date_prefix() -> str:
+    """Date component of new storage paths, formatted once per UTC day"""
+    global _date_prefix
+    epoch_day = int(time.time()) // 86400
+    day, prefix = _date_prefix
+    if day != epoch_day:
+        prefix = datetime.fromtimestamp(epoch_day * 86400, _UTC).strftime('%Y/%m/%d')
+        # A single tuple assignment, so concurrent readers never see a mismatched pair
+        _date_prefix = (epoch_day, prefix)
+    return prefix
+
+
+@lru_cache(maxsize=1)
+def _get_supabase() -> Client:
+    """Process-wide Supabase client, so every instance shares one connection pool"""
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_ANON_KEY")
+    
+    if not supabase_url or not supabase_key:
+        raise ValueError("Supabase URL and ANON_KEY must be set in environment variables")
+    
+    return create_client(supabase_url, supabase_key)
+
 
 class DataIntegrationService:
     def __init__(self):
-        # Initialize Supabase client
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("Supabase URL and ANON_KEY must be set in environment variables")
-        
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+        self.supabase: Client = _get_supabase()
         self.storage_bucket = os.getenv("SUPABASE_STORAGE_BUCKET", "data-files")
         
         # File validation settings
         self.max_file_size = int(os.getenv("MAX_FILE_SIZE", "1073741824"))  # 1GB default
-        self.allowed_mime_types = {
-            "seismic_data": ["application/octet-stream", "text/plain", "application/x-segy"],
-            "well_log": ["text/csv", "application/json", "text/plain"],
-            "core_sample": ["image/jpeg", "image/png", "image/tiff", "application/pdf"],
-            "production_data": ["text/csv", "application/json", "application/vnd.ms-excel"],
-            "reservoir_model": ["application/octet-stream", "text/plain"],
-            "geological_map": ["image/jpeg", "image/png", "image/tiff", "application/pdf"],
-            "report": ["application/pdf", "application/msword", "text/plain"],
-            "image": ["image/jpeg", "image/png", "image/tiff", "image/bmp"],
-            "document": ["application/pdf", "application/msword", "text/plain"],
-            "other": ["*/*"]
-        }
+        self.allowed_mime_types = ALLOWED_MIME_TYPES
 
     async def validate_file(self, file: UploadFile, file_type: str) -> FileValidationResult:
         """Validate uploaded file against predefined criteria"""
         errors = []
         warnings = []
         
-        # Check file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
+        # Check file size (Starlette records it while spooling; fall back to seeking)
+        file_size = file.size
+        if file_size is None:
+            file.file.seek(0, 2)  # Seek to end
+            file_size = file.file.tell()
+            file.file.seek(0)  # Reset to beginning
         
         if file_size > self.max_file_size:
             errors.append(f"File size ({file_size} bytes) exceeds maximum allowed size ({self.max_file_size} bytes)")
@@ -65,13 +112,13 @@ class DataIntegrationService:
             errors.append("File is empty")
         
         # Check MIME type
-        mime_type, _ = mimetypes.guess_type(file.filename)
+        mime_type = _guess_mime(os.path.splitext(file.filename)[1].lower()) if file.filename else None
         if not mime_type:
             mime_type = file.content_type or "application/octet-stream"
         
-        allowed_types = self.allowed_mime_types.get(file_type, ["*/*"])
+        allowed_types = self.allowed_mime_types.get(file_type, ANY_MIME_TYPE)
         if "*/*" not in allowed_types and mime_type not in allowed_types:
-            errors.append(f"File type '{mime_type}' not allowed for category '{file_type}'. Allowed types: {allowed_types}")
+            errors.append(f"File type '{mime_type}' not allowed for category '{file_type}'. Allowed types: {sorted(allowed_types)}")
         
         # Check filename
         if not file.filename:
@@ -91,18 +138,41 @@ class DataIntegrationService:
             warnings=warnings
         )
 
-    def _calculate_file_hash(self, file_content: bytes) -> str:
-        """Calculate SHA-256 hash of file content"""
-        return hashlib.sha256(file_content).hexdigest()
+    def _spool_upload(self, fileobj: BinaryIO) -> Tuple[str, str]:
+        """Copy an upload into a temp file the request does not own, hashing it in the same pass"""
+        file_hash = hashlib.sha256()
+        fileobj.seek(0)
+        with tempfile.NamedTemporaryFile(prefix="upload-", delete=False) as spool:
+            try:
+                for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b""):
+                    file_hash.update(chunk)
+                    spool.write(chunk)
+            except BaseException:
+                os.unlink(spool.name)
+                raise
+        return spool.name, file_hash.hexdigest()
+
+    def _ensure_not_duplicate(self, db: Session, file_hash: str):
+        """Reject content that is already stored, probing the unique file_hash index"""
+        existing_id = db.execute(
+            select(DataFile.id).where(DataFile.file_hash == file_hash)
+        ).scalar_one_or_none()
+        if existing_id:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"File already exists with ID: {existing_id}"
+            )
 
     async def initiate_file_upload(
         self, 
         file: UploadFile, 
         upload_request: FileUploadRequest,
         user_id: str,
-        db: Session
+        db: Session,
+        background_tasks: BackgroundTasks,
+        declared_hash: Optional[str] = None
     ) -> FileUploadResponse:
-        """Initiate file upload process"""
+        """Validate and register a file, then push it to storage after the response is sent"""
         
         # Validate file
         validation_result = await self.validate_file(file, upload_request.file_type.value)
@@ -115,21 +185,36 @@ class DataIntegrationService:
         # Generate unique file ID and path
         file_id = str(uuid4())
         file_extension = os.path.splitext(file.filename)[1] if file.filename else ""
-        storage_path = f"{upload_request.file_type.value}/{datetime.now().strftime('%Y/%m/%d')}/{file_id}{file_extension}"
+        storage_path = f"{upload_request.file_type.value}/{_storage_date_prefix()}/{file_id}{file_extension}"
+        
+        # A client-declared hash lets duplicates be rejected before any of the body is read
+        if declared_hash:
+            declared_hash = declared_hash.lower()
+            if not SHA256_HEX.fullmatch(declared_hash):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="X-Content-SHA256 must be a 64-character hex SHA-256 digest"
+                )
+            self._ensure_not_duplicate(db, declared_hash)
         
-        # Read file content and calculate hash
-        file_content = await file.read()
-        file_hash = self._calculate_file_hash(file_content)
-        await file.seek(0)  # Reset file pointer
+        # Spool and hash the upload on a worker thread; the spool file outlives the request's UploadFile
+        spool_path, file_hash = await run_in_threadpool(self._spool_upload, file.file)
         
-        # Check for duplicate files
-        existing_file = db.query(DataFile).filter(DataFile.file_hash == file_hash).first()
-        if existing_file:
+        if declared_hash and file_hash != declared_hash:
+            os.unlink(spool_path)
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"File already exists with ID: {existing_file.id}"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File content does not match the declared SHA-256 hash"
             )
         
+        # Check for duplicate files
+        if not declared_hash:
+            try:
+                self._ensure_not_duplicate(db, file_hash)
+            except HTTPException:
+                os.unlink(spool_path)
+                raise
+        
         # Create database record
         db_file = DataFile(
             id=file_id,
@@ -142,88 +227,116 @@ class DataIntegrationService:
             uploaded_by=user_id,
             status=FileStatus.UPLOADING,
             description=upload_request.description,
-            tags=json.dumps(upload_request.tags) if upload_request.tags else None,
+            tags=upload_request.tags or None,
             location=upload_request.location,
             acquisition_date=upload_request.acquisition_date,
             is_public=upload_request.is_public
         )
         
         db.add(db_file)
-        db.commit()
-        db.refresh(db_file)
-        
         try:
-            # Upload to Supabase Storage
-            upload_response = self.supabase.storage.from_(self.storage_bucket).upload(
-                path=storage_path,
-                file=file_content,
-                file_options={"content-type": validation_result.mime_type}
-            )
-            
-            if upload_response.get("error"):
-                raise Exception(f"Supabase upload failed: {upload_response['error']}")
-            
-            # Update file status to completed
-            db_file.status = FileStatus.COMPLETED
-            db.commit()
-            
-            # Log upload action
-            self._log_file_access(db, file_id, user_id, "upload")
-            
-            # Start background processing
-            await self._start_file_processing(db, file_id)
-            
-            return FileUploadResponse(
-                message="File uploaded successfully",
-                file_id=file_id,
-                upload_url=f"/{self.storage_bucket}/{storage_path}",
-                fields={"file_id": file_id, "status": "completed"}
-            )
-            
-        except Exception as e:
-            # Update file status to failed
-            db_file.status = FileStatus.FAILED
-            db_file.processing_error = str(e)
             db.commit()
-            
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"File upload failed: {str(e)}"
-            )
-
-    async def _start_file_processing(self, db: Session, file_id: str):
-        """Start background file processing jobs"""
-        
-        # Create metadata extraction job
-        metadata_job = DataIntegrationJob(
-            id=str(uuid4()),
-            file_id=file_id,
-            job_type="metadata_extraction",
-            status=ProcessingStatus.PENDING
+        except IntegrityError:
+            db.rollback()
+            os.unlink(spool_path)
+            # Only a concurrent upload of the same content winning the unique file_hash index is a conflict
+            self._ensure_not_duplicate(db, file_hash)
+            raise
+        
+        # Progress is reported through get_file_upload_status
+        background_tasks.add_task(
+            self._complete_upload, file_id, spool_path, storage_path, validation_result.mime_type, user_id
         )
         
-        # Create format validation job
-        validation_job = DataIntegrationJob(
-            id=str(uuid4()),
+        return FileUploadResponse(
+            message="File accepted for upload",
             file_id=file_id,
-            job_type="format_validation",
-            status=ProcessingStatus.PENDING
+            upload_url=f"/{self.storage_bucket}/{storage_path}",
+            fields={"file_id": file_id, "status": FileStatus.UPLOADING.value}
+        )
+
+    def _complete_upload(self, file_id: str, spool_path: str, storage_path: str, mime_type: str, user_id: str):
+        """Push a spooled upload to Supabase Storage and record the outcome, in a session of its own"""
+        db = SessionLocal()
+        uploaded = False
+        try:
+            try:
+                # storage3 streams a BufferedReader, so the body is never held in memory
+                with open(spool_path, "rb") as spool:
+                    upload_response = self.supabase.storage.from_(self.storage_bucket).upload(
+                        path=storage_path,
+                        file=spool,
+                        file_options={"content-type": mime_type}
+                    )
+                
+                if upload_response.get("error"):
+                    raise Exception(f"Supabase upload failed: {upload_response['error']}")
+                uploaded = True
+                
+                # Completion, the processing jobs and the upload log go out in one transaction
+                self._start_file_processing(db, file_id)
+                self._log_file_access(db, file_id, user_id, "upload")
+                db.commit()
+            except Exception as e:
+                # Nothing raised here reaches a client, so the row must never be left UPLOADING
+                db.rollback()
+                if uploaded:
+                    # A FAILED row must not leave its object behind in the bucket
+                    try:
+                        self.supabase.storage.from_(self.storage_bucket).remove([storage_path])
+                    except Exception:
+                        logger.exception("Failed to remove orphaned storage object %s", storage_path)
+                db.execute(
+                    update(DataFile)
+                    .where(DataFile.id == file_id)
+                    .values(status=FileStatus.FAILED, processing_error=str(e))
+                )
+                db.commit()
+        finally:
+            os.unlink(spool_path)
+            db.close()
+
+    def _start_file_processing(self, db: Session, file_id: str):
+        """Mark an uploaded file complete and queue its processing jobs, leaving the commit to the caller"""
+        
+        # Metadata extraction and format validation jobs, in one multi-row INSERT
+        db.execute(
+            insert(DataIntegrationJob),
+            [
+                {"id": str(uuid4()), "file_id": file_id, "job_type": job_type, "status": ProcessingStatus.PENDING}
+                for job_type in ("metadata_extraction", "format_validation")
+            ]
         )
         
-        db.add_all([metadata_job, validation_job])
-        db.commit()
-        
-        # Update file processing status
-        db_file = db.query(DataFile).filter(DataFile.id == file_id).first()
-        if db_file:
-            db_file.processing_status = ProcessingStatus.PENDING
-            db_file.processing_started_at = datetime.utcnow()
-            db.commit()
+        # Set upload and processing status directly instead of re-reading the row
+        db.execute(
+            update(DataFile)
+            .where(DataFile.id == file_id)
+            .values(
+                status=FileStatus.COMPLETED,
+                processing_status=ProcessingStatus.PENDING,
+                processing_started_at=datetime.now(_UTC)
+            )
+        )
 
-    def get_file_upload_status(self, file_id: str, db: Session) -> FileUploadStatusResponse:
+    async def get_file_upload_status(self, file_id: str, db: AsyncSession) -> FileUploadStatusResponse:
         """Get upload and processing status of a file"""
         
-        db_file = db.query(DataFile).filter(DataFile.id == file_id).first()
+        # The file's status and its job tallies in one round trip
+        db_file = (await db.execute(
+            select(
+                DataFile.status,
+                DataFile.processing_status,
+                DataFile.processing_error,
+                func.count(DataIntegrationJob.id).label("total_jobs"),
+                func.count(DataIntegrationJob.id).filter(
+                    DataIntegrationJob.status == ProcessingStatus.COMPLETED
+                ).label("completed_jobs")
+            )
+            .outerjoin(DataIntegrationJob, DataIntegrationJob.file_id == DataFile.id)
+            .where(DataFile.id == file_id)
+            .group_by(DataFile.id)
+        )).one_or_none()
         if not db_file:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -231,13 +344,10 @@ class DataIntegrationService:
             )
         
         # Calculate progress based on processing jobs
-        jobs = db.query(DataIntegrationJob).filter(DataIntegrationJob.file_id == file_id).all()
-        
-        if not jobs:
+        if not db_file.total_jobs:
             progress = 0.0
         else:
-            completed_jobs = sum(1 for job in jobs if job.status == ProcessingStatus.COMPLETED)
-            progress = (completed_jobs / len(jobs)) * 100
+            progress = (db_file.completed_jobs / db_file.total_jobs) * 100
         
         message = None
         if db_file.status == FileStatus.FAILED:
@@ -255,9 +365,9 @@ class DataIntegrationService:
             message=message
         )
 
-    def get_files(
+    async def get_files(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         user_id: str,
         file_type: Optional[str] = None,
         status: Optional[str] = None,
@@ -268,75 +378,56 @@ class DataIntegrationService:
     ) -> Dict[str, Any]:
         """Get list of files with filtering and pagination"""
         
-        query = db.query(DataFile)
-        
         # Filter by user access (own files or public files or shared files)
-        query = query.filter(
+        conditions = [
             or_(
                 DataFile.uploaded_by == user_id,
                 DataFile.is_public == True,
-                DataFile.id.in_(
-                    db.query(FileShare.file_id).filter(
-                        and_(FileShare.shared_with == user_id, FileShare.is_active == True)
-                    )
+                # Semi-join; several active shares of one file never duplicate it
+                exists().where(
+                    FileShare.file_id == DataFile.id,
+                    FileShare.shared_with == user_id,
+                    FileShare.is_active == True
                 )
             )
-        )
+        ]
         
         # Apply filters
         if file_type:
-            query = query.filter(DataFile.file_type == FileType(file_type))
+            conditions.append(DataFile.file_type == FileType(file_type))
         
         if status:
-            query = query.filter(DataFile.status == FileStatus(status))
+            conditions.append(DataFile.status == FileStatus(status))
         
         if is_public is not None:
-            query = query.filter(DataFile.is_public == is_public)
+            conditions.append(DataFile.is_public == is_public)
         
         if search:
-            search_filter = or_(
+            conditions.append(or_(
                 DataFile.original_filename.ilike(f"%{search}%"),
                 DataFile.description.ilike(f"%{search}%"),
-                DataFile.tags.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
-        
-        # Count total records
-        total = query.count()
+                DataFile.tags.contains([search])
+            ))
         
-        # Apply pagination
+        # Fetch the page with the total alongside each row (window count) in one round trip
         offset = (page - 1) * page_size
-        files = query.order_by(desc(DataFile.created_at)).offset(offset).limit(page_size).all()
-        
-        # Convert to response format
-        file_responses = []
-        for file in files:
-            tags = json.loads(file.tags) if file.tags else []
-            file_response = DataFileResponse(
-                id=file.id,
-                original_filename=file.original_filename,
-                file_path=file.file_path,
-                file_size=file.file_size,
-                file_type=file.file_type,
-                mime_type=file.mime_type,
-                file_hash=file.file_hash,
-                uploaded_by=file.uploaded_by,
-                upload_timestamp=file.upload_timestamp,
-                status=file.status,
-                processing_status=file.processing_status,
-                processing_started_at=file.processing_started_at,
-                processing_completed_at=file.processing_completed_at,
-                processing_error=file.processing_error,
-                description=file.description,
-                tags=tags,
-                location=file.location,
-                acquisition_date=file.acquisition_date,
-                is_public=file.is_public,
-                is_archived=file.is_archived,
-                created_at=file.created_at,
-                updated_at=file.updated_at
-            )
-            file_responses.append(file_response)
+        rows = (await db.execute(
+            select(DataFile, func.count().over()).where(*conditions)
+            .order_by(desc(DataFile.created_at)).offset(offset).limit(page_size)
+        )).all()
+        
+        if rows:
+            total = rows[0][1]
+        elif offset == 0:
+            total = 0
+        else:
+            # Past the last page there is no row to carry the window count
+            total = await db.scalar(select(func.count()).select_from(DataFile).where(*conditions))
+        
+        # tags is JSONB, so the page validates straight from row attributes in one adapter call
+        file_responses = DATA_FILE_RESPONSE_LIST.validate_python(
+            [file for file, _ in rows], from_attributes=True
+        )
         
         return {
             "files": file_responses,
@@ -346,15 +437,16 @@ class DataIntegrationService:
             "total_pages": (total + page_size - 1) // page_size
         }
 
-    def get_file_download_url(self, file_id: str, user_id: str, db: Session) -> str:
-        """Generate signed URL for file download"""
+    async def get_file_download_url(self, file_id: str, user_id: str, db: AsyncSession) -> str:
+        """Generate signed URL for file download; the caller records the download with record_file_access"""
         
         # Check file access permissions
-        db_file = self._check_file_access(db, file_id, user_id, "read")
+        db_file = await self._check_file_access_async(db, file_id, user_id, "read")
         
         try:
-            # Generate signed URL from Supabase Storage
-            signed_url = self.supabase.storage.from_(self.storage_bucket).create_signed_url(
+            # Generate signed URL from Supabase Storage (blocking client, so off the event loop)
+            signed_url = await run_in_threadpool(
+                self.supabase.storage.from_(self.storage_bucket).create_signed_url,
                 path=db_file.file_path,
                 expires_in=3600  # 1 hour
             )
@@ -362,9 +454,6 @@ class DataIntegrationService:
             if signed_url.get("error"):
                 raise Exception(f"Failed to generate download URL: {signed_url['error']}")
             
-            # Log download action
-            self._log_file_access(db, file_id, user_id, "download")
-            
             return signed_url["signedURL"]
             
         except Exception as e:
@@ -404,9 +493,51 @@ class DataIntegrationService:
         
         return db_file
 
-    def _log_file_access(self, db: Session, file_id: str, user_id: str, action: str, 
+    async def _check_file_access_async(self, db: AsyncSession, file_id: str, user_id: str, permission: str = "read") -> DataFile:
+        """Check if user has access to file without blocking the event loop"""
+        
+        db_file = await db.get(DataFile, file_id)
+        if not db_file:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
+        
+        # Check access permissions
+        has_access = db_file.uploaded_by == user_id or db_file.is_public  # Owner or public file
+        if not has_access:
+            # Shared file
+            share_id = await db.scalar(
+                select(FileShare.id).where(
+                    and_(
+                        FileShare.file_id == file_id,
+                        FileShare.shared_with == user_id,
+                        FileShare.is_active == True
+                    )
+                ).limit(1)
+            )
+            has_access = share_id is not None
+        
+        if not has_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        
+        return db_file
+
+    def record_file_access(self, file_id: str, user_id: str, action: str):
+        """Write an access log row in a short-lived session of its own, for use after the response"""
+        db = SessionLocal()
+        try:
+            self._log_file_access(db, file_id, user_id, action)
+            db.commit()
+        finally:
+            db.close()
+
+    def _log_file_access(self, db: Union[Session, AsyncSession], file_id: str, user_id: str, action: str, 
                         ip_address: str = None, user_agent: str = None):
-        """Log file access activity"""
+        """Log file access activity; the row is committed with the caller's transaction, sync or async"""
         
         access_log = FileAccessLog(
             id=str(uuid4()),
@@ -418,7 +549,6 @@ class DataIntegrationService:
         )
         
         db.add(access_log)
-        db.commit()
 
     def update_file(self, file_id: str, update_request: FileUpdateRequest, 
                    user_id: str, db: Session) -> DataFileResponse:
@@ -431,7 +561,7 @@ class DataIntegrationService:
             db_file.description = update_request.description
         
         if update_request.tags is not None:
-            db_file.tags = json.dumps(update_request.tags)
+            db_file.tags = update_request.tags
         
         if update_request.location is not None:
             db_file.location = update_request.location
@@ -445,38 +575,14 @@ class DataIntegrationService:
         if update_request.is_archived is not None:
             db_file.is_archived = update_request.is_archived
         
+        # Log update action alongside the changes
+        self._log_file_access(db, file_id, user_id, "update")
+        
         db.commit()
         db.refresh(db_file)
         
-        # Log update action
-        self._log_file_access(db, file_id, user_id, "update")
-        
         # Convert to response
-        tags = json.loads(db_file.tags) if db_file.tags else []
-        return DataFileResponse(
-            id=db_file.id,
-            original_filename=db_file.original_filename,
-            file_path=db_file.file_path,
-            file_size=db_file.file_size,
-            file_type=db_file.file_type,
-            mime_type=db_file.mime_type,
-            file_hash=db_file.file_hash,
-            uploaded_by=db_file.uploaded_by,
-            upload_timestamp=db_file.upload_timestamp,
-            status=db_file.status,
-            processing_status=db_file.processing_status,
-            processing_started_at=db_file.processing_started_at,
-            processing_completed_at=db_file.processing_completed_at,
-            processing_error=db_file.processing_error,
-            description=db_file.description,
-            tags=tags,
-            location=db_file.location,
-            acquisition_date=db_file.acquisition_date,
-            is_public=db_file.is_public,
-            is_archived=db_file.is_archived,
-            created_at=db_file.created_at,
-            updated_at=db_file.updated_at
-        )
+        return DataFileResponse.model_validate(db_file)
 
     def delete_file(self, file_id: str, user_id: str, db: Session) -> Dict[str, str]:
         """Delete a file"""
@@ -497,12 +603,8 @@ class DataIntegrationService:
             if delete_response.get("error"):
                 raise Exception(f"Failed to delete from storage: {delete_response['error']}")
             
-            # Delete related records from database
-            db.query(FileMetadata).filter(FileMetadata.file_id == file_id).delete()
-            db.query(FileAccessLog).filter(FileAccessLog.file_id == file_id).delete()
-            db.query(FileShare).filter(FileShare.file_id == file_id).delete()
-            db.query(DataIntegrationJob).filter(DataIntegrationJob.file_id == file_id).delete()
-            db.query(DataFile).filter(DataFile.id == file_id).delete()
+            # Metadata, access logs, shares and jobs go with it via ON DELETE CASCADE
+            db.execute(delete(DataFile).where(DataFile.id == file_id))
             
             db.commit()
             
@@ -518,15 +620,17 @@ class DataIntegrationService:
     def get_processing_summary(self, user_id: str, db: Session) -> ProcessingSummary:
         """Get processing summary for user's files"""
         
-        # Get user's files
-        user_files = db.query(DataFile).filter(DataFile.uploaded_by == user_id)
-        
-        total_files = user_files.count()
-        successful_uploads = user_files.filter(DataFile.status == FileStatus.COMPLETED).count()
-        failed_uploads = user_files.filter(DataFile.status == FileStatus.FAILED).count()
-        files_in_processing = user_files.filter(
-            DataFile.processing_status.in_([ProcessingStatus.PENDING, ProcessingStatus.IN_PROGRESS])
-        ).count()
+        # Count the user's files by outcome in a single aggregate pass
+        counts = db.execute(
+            select(
+                func.count().label("total_files"),
+                func.count().filter(DataFile.status == FileStatus.COMPLETED).label("successful_uploads"),
+                func.count().filter(DataFile.status == FileStatus.FAILED).label("failed_uploads"),
+                func.count().filter(
+                    DataFile.processing_status.in_([ProcessingStatus.PENDING, ProcessingStatus.IN_PROGRESS])
+                ).label("files_in_processing")
+            ).where(DataFile.uploaded_by == user_id)
+        ).one()
         
         # Get recent activity
         recent_logs = db.query(FileAccessLog).filter(
@@ -534,10 +638,10 @@ class DataIntegrationService:
         ).order_by(desc(FileAccessLog.timestamp)).limit(10).all()
         
         return ProcessingSummary(
-            total_files=total_files,
-            successful_uploads=successful_uploads,
-            failed_uploads=failed_uploads,
-            files_in_processing=files_in_processing,
+            total_files=counts.total_files,
+            successful_uploads=counts.successful_uploads,
+            failed_uploads=counts.failed_uploads,
+            files_in_processing=counts.files_in_processing,
             recent_activity=[
                 {
                     "id": log.id,
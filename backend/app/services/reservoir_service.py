@@ -1,11 +1,16 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc, func
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, desc, asc, func, tuple_, update, select, insert, exists, delete
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException
+from typing import List, Optional, Dict, Any, Union, Tuple
+from datetime import datetime, timedelta, timezone
 import uuid
+import base64
 import json
 import os
 import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from app.models.reservoir import (
@@ -21,14 +26,103 @@ from app.schemas.reservoir import (
     PredictionSessionCreate, PredictiveAnalysisRequest
 )
 
+# Compiled SQL for the list queries, keyed by SQLAlchemy on which filters are present.
+# Kept apart from the engine-wide LRU so these few shapes are never evicted by other queries.
+_LIST_QUERY_CACHE: Dict[Any, Any] = {}
+
+logger = logging.getLogger(__name__)
+
+# Reservoir timestamps are timestamptz columns, so write aware UTC values
+_UTC = timezone.utc
+
+# Threads used to remove stored files during bulk deletes
+FILE_DELETE_WORKERS = 8
+
+
+def _safe_unlink(file_path: str) -> bool:
+    """Remove a stored data file, tolerating one that is already gone; False if it could not be removed"""
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Error deleting reservoir data file {file_path}: {e}")
+        return False
+    return True
+
+
+def encode_warning_cursor(warning: ReservoirWarning) -> str:
+    """Opaque keyset cursor for the warning a page of unacknowledged warnings ended on"""
+    key = f"{warning.severity_level.name}|{warning.created_at.isoformat()}|{warning.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_warning_cursor(cursor: str) -> Tuple[WarningLevel, datetime, str]:
+    """Inverse of encode_warning_cursor; a malformed cursor is a client error"""
+    try:
+        severity, created_at, warning_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return WarningLevel[severity], datetime.fromisoformat(created_at), warning_id
+    except (ValueError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 class ReservoirService:
-    def __init__(self, db: Session):
-        self.db = db
+    # Query helpers
+    def _build_filters(self, model, contains: Dict[str, Optional[str]] = None, **equals) -> list:
+        """Build a list query's WHERE clauses: equality per keyword, substring match per `contains` entry.
+        
+        Unset criteria (None or an empty string) are skipped; False is a real filter value.
+        """
+        filters = [
+            getattr(model, column) == value
+            for column, value in equals.items()
+            if value is not None and value != ""
+        ]
+        for column, value in (contains or {}).items():
+            if value:
+                filters.append(getattr(model, column).ilike(f"%{value}%"))
+        return filters
+
+    def _page(self, db: Session, model, sort_column, filters: list, skip: int, limit: int, after_id: str = None) -> list:
+        """Newest-first page ordered by (sort_column, id).
+        
+        With `after_id` (the last row of the previous page) the page continues from that row by
+        keyset and `skip` is ignored. An `after_id` that matches no row is a client error.
+        """
+        query = db.query(model).execution_options(compiled_cache=_LIST_QUERY_CACHE).filter(*filters)
+        if after_id:
+            cursor = db.query(sort_column).filter(model.id == after_id).first()
+            if cursor is None:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.filter(tuple_(sort_column, model.id) < tuple_(cursor[0], after_id))
+            skip = 0
+        return query.order_by(desc(sort_column), desc(model.id)).offset(skip).limit(limit).all()
+
+    def _update_returning(self, db: Session, model, row_id: str, values: Dict[str, Any]):
+        """Apply `values` to one row and return it via UPDATE ... RETURNING, or None if no row matched.
+        
+        populate_existing refreshes an instance already in the session from the returned row.
+        """
+        row = db.execute(
+            update(model).where(model.id == row_id).values(**values).returning(model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).scalar_one_or_none()
+        db.commit()
+        return row
+
+    def _count(self, db: Session, model, filters: list) -> int:
+        """Plain COUNT(*) over the filtered table, so Postgres can answer it from an index"""
+        return db.execute(
+            select(func.count()).select_from(model).where(*filters)
+            .execution_options(compiled_cache=_LIST_QUERY_CACHE)
+        ).scalar_one()
 
     # Reservoir Data CRUD Operations
-    def create_reservoir_data(self, data: ReservoirDataCreate, user_id: str, file_path: str, file_size: int) -> ReservoirData:
-        """Create new reservoir data entry"""
+    def create_reservoir_data(
+        self, db: Session, data: ReservoirDataCreate, user_id: str, file_path: str, file_size: int,
+        content_sha256: str = None
+    ) -> ReservoirData:
+        """Create new reservoir data entry, or return the user's existing entry with the same content"""
         db_data = ReservoirData(
             id=str(uuid.uuid4()),
             name=data.name,
@@ -36,6 +130,7 @@ class ReservoirService:
             data_type=data.data_type,
             file_path=file_path,
             file_size=file_size,
+            content_sha256=content_sha256,
             metadata=data.metadata,
             location_data=data.location_data,
             time_range_start=data.time_range_start,
@@ -43,74 +138,102 @@ class ReservoirService:
             uploaded_by=user_id,
             is_processed=False
         )
-        self.db.add(db_data)
-        self.db.commit()
-        self.db.refresh(db_data)
+        db.add(db_data)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Unique (uploaded_by, content_sha256) index: the same bytes were stored concurrently.
+            # Any other violation (foreign key, NOT NULL) leaves no such row and is re-raised.
+            db.rollback()
+            if content_sha256 is None:
+                raise
+            existing_data = self.get_data_by_hash(db, user_id, content_sha256)
+            if existing_data is None:
+                raise
+            return existing_data
         return db_data
 
-    def get_reservoir_data(self, data_id: str) -> Optional[ReservoirData]:
+    def get_data_by_hash(self, db: Session, user_id: str, content_sha256: str) -> Optional[ReservoirData]:
+        """Get a user's reservoir data by the SHA-256 of its file content"""
+        return db.query(ReservoirData).filter(
+            ReservoirData.uploaded_by == user_id,
+            ReservoirData.content_sha256 == content_sha256
+        ).first()
+
+    def get_reservoir_data(self, db: Session, data_id: str) -> Optional[ReservoirData]:
         """Get reservoir data by ID"""
-        return self.db.query(ReservoirData).filter(ReservoirData.id == data_id).first()
+        return db.query(ReservoirData).filter(ReservoirData.id == data_id).first()
 
     def get_reservoir_data_list(
-        self, 
+        self,
+        db: Session,
         user_id: str = None,
         data_type: ReservoirDataType = None,
         is_processed: bool = None,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[ReservoirData], int]:
+        limit: int = 50,
+        exact_count: bool = True,
+        after_id: str = None
+    ) -> tuple[List[ReservoirData], Optional[int]]:
         """Get list of reservoir data with filtering"""
-        query = self.db.query(ReservoirData)
+        filters = self._build_filters(
+            ReservoirData, uploaded_by=user_id, data_type=data_type, is_processed=is_processed
+        )
         
-        if user_id:
-            query = query.filter(ReservoirData.uploaded_by == user_id)
-        if data_type:
-            query = query.filter(ReservoirData.data_type == data_type)
-        if is_processed is not None:
-            query = query.filter(ReservoirData.is_processed == is_processed)
-            
-        total = query.count()
-        items = query.order_by(desc(ReservoirData.created_at)).offset(skip).limit(limit).all()
+        # Counting is a second scan of the filtered rows, so it is optional
+        total = self._count(db, ReservoirData, filters) if exact_count else None
+        items = self._page(db, ReservoirData, ReservoirData.created_at, filters, skip, limit, after_id)
         
         return items, total
 
-    def update_reservoir_data(self, data_id: str, data: ReservoirDataUpdate) -> Optional[ReservoirData]:
+    def update_reservoir_data(self, db: Session, data_id: str, data: ReservoirDataUpdate) -> Optional[ReservoirData]:
         """Update reservoir data"""
-        db_data = self.get_reservoir_data(data_id)
-        if not db_data:
-            return None
-            
         update_dict = {k: v for k, v in data.dict(exclude_unset=True).items() if v is not None}
-        update_dict['updated_at'] = datetime.utcnow()
+        update_dict['updated_at'] = datetime.now(_UTC)
         
-        for key, value in update_dict.items():
-            setattr(db_data, key, value)
-            
-        self.db.commit()
-        self.db.refresh(db_data)
-        return db_data
+        return self._update_returning(db, ReservoirData, data_id, update_dict)
 
-    def delete_reservoir_data(self, data_id: str) -> bool:
+    def delete_reservoir_data(self, db: Session, data_id: str) -> bool:
         """Delete reservoir data and associated file"""
-        db_data = self.get_reservoir_data(data_id)
+        db_data = self.get_reservoir_data(db, data_id)
         if not db_data:
             return False
             
         # Delete associated file
-        try:
-            if os.path.exists(db_data.file_path):
-                os.remove(db_data.file_path)
-        except Exception as e:
-            print(f"Error deleting file: {e}")
+        _safe_unlink(db_data.file_path)
             
         # Delete from database
-        self.db.delete(db_data)
-        self.db.commit()
+        db.delete(db_data)
+        db.commit()
         return True
 
+    def delete_reservoir_data_bulk(self, db: Session, data_ids: List[str]) -> List[str]:
+        """Delete many reservoir data entries and their files, returning the IDs that were deleted"""
+        if not data_ids:
+            return []
+        
+        # One DELETE hands back the file paths, so nothing is loaded beforehand
+        deleted = db.execute(
+            delete(ReservoirData)
+            .where(ReservoirData.id.in_(data_ids))
+            .returning(ReservoirData.id, ReservoirData.file_path)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        
+        # Files go only once the rows are gone; unlinks are independent syscalls, so overlap them
+        paths = [row.file_path for row in deleted]
+        with ThreadPoolExecutor(max_workers=FILE_DELETE_WORKERS) as pool:
+            removed = list(pool.map(_safe_unlink, paths))
+        
+        orphaned = [path for path, ok in zip(paths, removed) if not ok]
+        if orphaned:
+            logger.warning(f"Bulk delete left {len(orphaned)} orphaned reservoir data files: {orphaned}")
+        
+        return [row.id for row in deleted]
+
     # Reservoir Simulation CRUD Operations
-    def create_reservoir_simulation(self, simulation: ReservoirSimulationCreate, user_id: str) -> ReservoirSimulation:
+    def create_reservoir_simulation(self, db: Session, simulation: ReservoirSimulationCreate, user_id: str) -> ReservoirSimulation:
         """Create new reservoir simulation"""
         db_simulation = ReservoirSimulation(
             id=str(uuid.uuid4()),
@@ -122,104 +245,77 @@ class ReservoirService:
             created_by=user_id,
             status=SimulationStatus.PENDING
         )
-        self.db.add(db_simulation)
-        self.db.commit()
-        self.db.refresh(db_simulation)
+        db.add(db_simulation)
+        db.commit()
         return db_simulation
 
-    def get_reservoir_simulation(self, simulation_id: str) -> Optional[ReservoirSimulation]:
+    def get_reservoir_simulation(self, db: Session, simulation_id: str) -> Optional[ReservoirSimulation]:
         """Get reservoir simulation by ID"""
-        return self.db.query(ReservoirSimulation).filter(ReservoirSimulation.id == simulation_id).first()
+        return db.query(ReservoirSimulation).filter(ReservoirSimulation.id == simulation_id).first()
 
     def get_simulation_list(
         self,
+        db: Session,
         user_id: str = None,
         reservoir_data_id: str = None,
         status: SimulationStatus = None,
         extraction_scenario: str = None,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[ReservoirSimulation], int]:
+        limit: int = 50,
+        exact_count: bool = True,
+        after_id: str = None
+    ) -> tuple[List[ReservoirSimulation], Optional[int]]:
         """Get list of simulations with filtering"""
-        query = self.db.query(ReservoirSimulation)
+        filters = self._build_filters(
+            ReservoirSimulation,
+            contains={"extraction_scenario": extraction_scenario},
+            created_by=user_id, reservoir_data_id=reservoir_data_id, status=status
+        )
         
-        if user_id:
-            query = query.filter(ReservoirSimulation.created_by == user_id)
-        if reservoir_data_id:
-            query = query.filter(ReservoirSimulation.reservoir_data_id == reservoir_data_id)
-        if status:
-            query = query.filter(ReservoirSimulation.status == status)
-        if extraction_scenario:
-            query = query.filter(ReservoirSimulation.extraction_scenario.ilike(f"%{extraction_scenario}%"))
-            
-        total = query.count()
-        items = query.order_by(desc(ReservoirSimulation.created_at)).offset(skip).limit(limit).all()
+        # Counting is a second scan of the filtered rows, so it is optional
+        total = self._count(db, ReservoirSimulation, filters) if exact_count else None
+        items = self._page(db, ReservoirSimulation, ReservoirSimulation.created_at, filters, skip, limit, after_id)
         
         return items, total
 
-    def update_reservoir_simulation(self, simulation_id: str, simulation: ReservoirSimulationUpdate) -> Optional[ReservoirSimulation]:
+    def update_reservoir_simulation(self, db: Session, simulation_id: str, simulation: ReservoirSimulationUpdate) -> Optional[ReservoirSimulation]:
         """Update reservoir simulation"""
-        db_simulation = self.get_reservoir_simulation(simulation_id)
-        if not db_simulation:
-            return None
-            
         update_dict = {k: v for k, v in simulation.dict(exclude_unset=True).items() if v is not None}
-        update_dict['updated_at'] = datetime.utcnow()
+        update_dict['updated_at'] = datetime.now(_UTC)
         
-        for key, value in update_dict.items():
-            setattr(db_simulation, key, value)
-            
-        self.db.commit()
-        self.db.refresh(db_simulation)
-        return db_simulation
+        return self._update_returning(db, ReservoirSimulation, simulation_id, update_dict)
 
-    def start_simulation(self, simulation_id: str) -> Optional[ReservoirSimulation]:
+    def start_simulation(self, db: Session, simulation_id: str) -> Optional[ReservoirSimulation]:
         """Mark simulation as started"""
-        db_simulation = self.get_reservoir_simulation(simulation_id)
-        if not db_simulation:
-            return None
-            
-        db_simulation.status = SimulationStatus.PROCESSING
-        db_simulation.started_at = datetime.utcnow()
-        db_simulation.updated_at = datetime.utcnow()
-        
-        self.db.commit()
-        self.db.refresh(db_simulation)
-        return db_simulation
+        now = datetime.now(_UTC)
+        return self._update_returning(db, ReservoirSimulation, simulation_id, {
+            'status': SimulationStatus.PROCESSING,
+            'started_at': now,
+            'updated_at': now
+        })
 
-    def complete_simulation(self, simulation_id: str, results_summary: Dict[str, Any], visualization_data: Dict[str, Any], results_path: str = None) -> Optional[ReservoirSimulation]:
+    def complete_simulation(self, db: Session, simulation_id: str, results_summary: Dict[str, Any], visualization_data: Dict[str, Any], results_path: str = None) -> Optional[ReservoirSimulation]:
         """Mark simulation as completed with results"""
-        db_simulation = self.get_reservoir_simulation(simulation_id)
-        if not db_simulation:
-            return None
-            
-        db_simulation.status = SimulationStatus.COMPLETED
-        db_simulation.completed_at = datetime.utcnow()
-        db_simulation.results_summary = results_summary
-        db_simulation.visualization_data = visualization_data
-        db_simulation.results_path = results_path
-        db_simulation.updated_at = datetime.utcnow()
-        
-        self.db.commit()
-        self.db.refresh(db_simulation)
-        return db_simulation
+        now = datetime.now(_UTC)
+        return self._update_returning(db, ReservoirSimulation, simulation_id, {
+            'status': SimulationStatus.COMPLETED,
+            'completed_at': now,
+            'results_summary': results_summary,
+            'visualization_data': visualization_data,
+            'results_path': results_path,
+            'updated_at': now
+        })
 
-    def fail_simulation(self, simulation_id: str, error_message: str) -> Optional[ReservoirSimulation]:
+    def fail_simulation(self, db: Session, simulation_id: str, error_message: str) -> Optional[ReservoirSimulation]:
         """Mark simulation as failed"""
-        db_simulation = self.get_reservoir_simulation(simulation_id)
-        if not db_simulation:
-            return None
-            
-        db_simulation.status = SimulationStatus.FAILED
-        db_simulation.error_message = error_message
-        db_simulation.updated_at = datetime.utcnow()
-        
-        self.db.commit()
-        self.db.refresh(db_simulation)
-        return db_simulation
+        return self._update_returning(db, ReservoirSimulation, simulation_id, {
+            'status': SimulationStatus.FAILED,
+            'error_message': error_message,
+            'updated_at': datetime.now(_UTC)
+        })
 
     # Reservoir Forecast CRUD Operations
-    def create_reservoir_forecast(self, forecast: ReservoirForecastCreate, user_id: str) -> ReservoirForecast:
+    def create_reservoir_forecast(self, db: Session, forecast: ReservoirForecastCreate, user_id: str) -> ReservoirForecast:
         """Create new reservoir forecast"""
         db_forecast = ReservoirForecast(
             id=str(uuid.uuid4()),
@@ -233,71 +329,57 @@ class ReservoirService:
             status=ForecastStatus.DRAFT,
             forecast_data={}  # Will be populated by ML service
         )
-        self.db.add(db_forecast)
-        self.db.commit()
-        self.db.refresh(db_forecast)
+        db.add(db_forecast)
+        db.commit()
         return db_forecast
 
-    def get_reservoir_forecast(self, forecast_id: str) -> Optional[ReservoirForecast]:
+    def get_reservoir_forecast(self, db: Session, forecast_id: str) -> Optional[ReservoirForecast]:
         """Get reservoir forecast by ID"""
-        return self.db.query(ReservoirForecast).filter(ReservoirForecast.id == forecast_id).first()
+        return db.query(ReservoirForecast).filter(ReservoirForecast.id == forecast_id).first()
 
     def get_forecast_list(
         self,
+        db: Session,
         user_id: str = None,
         simulation_id: str = None,
         status: ForecastStatus = None,
         model_type: str = None,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[ReservoirForecast], int]:
+        limit: int = 50,
+        exact_count: bool = True,
+        after_id: str = None
+    ) -> tuple[List[ReservoirForecast], Optional[int]]:
         """Get list of forecasts with filtering"""
-        query = self.db.query(ReservoirForecast)
+        filters = self._build_filters(
+            ReservoirForecast,
+            contains={"model_type": model_type},
+            created_by=user_id, simulation_id=simulation_id, status=status
+        )
         
-        if user_id:
-            query = query.filter(ReservoirForecast.created_by == user_id)
-        if simulation_id:
-            query = query.filter(ReservoirForecast.simulation_id == simulation_id)
-        if status:
-            query = query.filter(ReservoirForecast.status == status)
-        if model_type:
-            query = query.filter(ReservoirForecast.model_type.ilike(f"%{model_type}%"))
-            
-        total = query.count()
-        items = query.order_by(desc(ReservoirForecast.generated_at)).offset(skip).limit(limit).all()
+        # Counting is a second scan of the filtered rows, so it is optional
+        total = self._count(db, ReservoirForecast, filters) if exact_count else None
+        items = self._page(db, ReservoirForecast, ReservoirForecast.generated_at, filters, skip, limit, after_id)
         
         return items, total
 
-    def update_reservoir_forecast(self, forecast_id: str, forecast: ReservoirForecastUpdate) -> Optional[ReservoirForecast]:
+    def update_reservoir_forecast(self, db: Session, forecast_id: str, forecast: ReservoirForecastUpdate) -> Optional[ReservoirForecast]:
         """Update reservoir forecast"""
-        db_forecast = self.get_reservoir_forecast(forecast_id)
-        if not db_forecast:
-            return None
-            
         update_dict = {k: v for k, v in forecast.dict(exclude_unset=True).items() if v is not None}
+        if not update_dict:
+            # Forecasts have no updated_at to bump, so an empty update is just a read
+            return self.get_reservoir_forecast(db, forecast_id)
         
-        for key, value in update_dict.items():
-            setattr(db_forecast, key, value)
-            
-        self.db.commit()
-        self.db.refresh(db_forecast)
-        return db_forecast
+        return self._update_returning(db, ReservoirForecast, forecast_id, update_dict)
 
-    def publish_forecast(self, forecast_id: str) -> Optional[ReservoirForecast]:
+    def publish_forecast(self, db: Session, forecast_id: str) -> Optional[ReservoirForecast]:
         """Publish a forecast"""
-        db_forecast = self.get_reservoir_forecast(forecast_id)
-        if not db_forecast:
-            return None
-            
-        db_forecast.status = ForecastStatus.PUBLISHED
-        db_forecast.published_at = datetime.utcnow()
-        
-        self.db.commit()
-        self.db.refresh(db_forecast)
-        return db_forecast
+        return self._update_returning(db, ReservoirForecast, forecast_id, {
+            'status': ForecastStatus.PUBLISHED,
+            'published_at': datetime.now(_UTC)
+        })
 
     # Reservoir Warning CRUD Operations
-    def create_reservoir_warning(self, warning: ReservoirWarningCreate) -> ReservoirWarning:
+    def create_reservoir_warning(self, db: Session, warning: ReservoirWarningCreate) -> ReservoirWarning:
         """Create new reservoir warning"""
         db_warning = ReservoirWarning(
             id=str(uuid.uuid4()),
@@ -312,67 +394,86 @@ class ReservoirService:
             confidence_score=warning.confidence_score,
             is_acknowledged=False
         )
-        self.db.add(db_warning)
-        self.db.commit()
-        self.db.refresh(db_warning)
+        db.add(db_warning)
+        db.commit()
         return db_warning
 
+    def create_warnings_bulk(
+        self, db: Session, warnings: List[Union[ReservoirWarningCreate, Dict[str, Any]]]
+    ) -> List[str]:
+        """Create many warnings with one multi-row INSERT, returning their IDs in input order"""
+        if not warnings:
+            return []
+        
+        rows = []
+        for warning in warnings:
+            values = warning.model_dump() if isinstance(warning, ReservoirWarningCreate) else dict(warning)
+            values['id'] = str(uuid.uuid4())
+            # Accept the schema enum, the model enum or its raw value
+            values['severity_level'] = WarningLevel(values['severity_level'])
+            values['is_acknowledged'] = False
+            rows.append(values)
+        
+        # IDs are generated here, so nothing needs to be read back
+        db.execute(insert(ReservoirWarning), rows)
+        db.commit()
+        return [row['id'] for row in rows]
+
     def get_warning_list(
         self,
+        db: Session,
         forecast_id: str = None,
         severity_level: WarningLevel = None,
         is_acknowledged: bool = None,
         warning_type: str = None,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[ReservoirWarning], int]:
+        limit: int = 50,
+        exact_count: bool = True,
+        after_id: str = None
+    ) -> tuple[List[ReservoirWarning], Optional[int]]:
         """Get list of warnings with filtering"""
-        query = self.db.query(ReservoirWarning)
+        filters = self._build_filters(
+            ReservoirWarning,
+            contains={"warning_type": warning_type},
+            forecast_id=forecast_id, severity_level=severity_level, is_acknowledged=is_acknowledged
+        )
         
-        if forecast_id:
-            query = query.filter(ReservoirWarning.forecast_id == forecast_id)
-        if severity_level:
-            query = query.filter(ReservoirWarning.severity_level == severity_level)
-        if is_acknowledged is not None:
-            query = query.filter(ReservoirWarning.is_acknowledged == is_acknowledged)
-        if warning_type:
-            query = query.filter(ReservoirWarning.warning_type.ilike(f"%{warning_type}%"))
-            
-        total = query.count()
-        items = query.order_by(desc(ReservoirWarning.created_at)).offset(skip).limit(limit).all()
+        # Counting is a second scan of the filtered rows, so it is optional
+        total = self._count(db, ReservoirWarning, filters) if exact_count else None
+        items = self._page(db, ReservoirWarning, ReservoirWarning.created_at, filters, skip, limit, after_id)
         
         return items, total
 
-    def acknowledge_warning(self, warning_id: str, user_id: str) -> Optional[ReservoirWarning]:
+    def acknowledge_warning(self, db: Session, warning_id: str, user_id: str) -> Optional[ReservoirWarning]:
         """Acknowledge a warning"""
-        db_warning = self.db.query(ReservoirWarning).filter(ReservoirWarning.id == warning_id).first()
-        if not db_warning:
-            return None
-            
-        db_warning.is_acknowledged = True
-        db_warning.acknowledged_by = user_id
-        db_warning.acknowledged_at = datetime.utcnow()
-        db_warning.updated_at = datetime.utcnow()
-        
-        self.db.commit()
-        self.db.refresh(db_warning)
-        return db_warning
+        now = datetime.now(_UTC)
+        return self._update_returning(db, ReservoirWarning, warning_id, {
+            'is_acknowledged': True,
+            'acknowledged_by': user_id,
+            'acknowledged_at': now,
+            'updated_at': now
+        })
 
-    def acknowledge_multiple_warnings(self, warning_ids: List[str], user_id: str) -> List[ReservoirWarning]:
-        """Acknowledge multiple warnings"""
-        warnings = self.db.query(ReservoirWarning).filter(ReservoirWarning.id.in_(warning_ids)).all()
-        
-        for warning in warnings:
-            warning.is_acknowledged = True
-            warning.acknowledged_by = user_id
-            warning.acknowledged_at = datetime.utcnow()
-            warning.updated_at = datetime.utcnow()
-            
-        self.db.commit()
-        return warnings
+    def acknowledge_multiple_warnings(self, db: Session, warning_ids: List[str], user_id: str) -> List[str]:
+        """Acknowledge multiple warnings in one UPDATE, returning the IDs that matched"""
+        stmt = (
+            update(ReservoirWarning)
+            .where(ReservoirWarning.id.in_(warning_ids))
+            .values(
+                is_acknowledged=True,
+                acknowledged_by=user_id,
+                acknowledged_at=func.now(),
+                updated_at=func.now()
+            )
+            .returning(ReservoirWarning.id)
+            .execution_options(synchronize_session=False)
+        )
+        acknowledged_ids = db.execute(stmt).scalars().all()
+        db.commit()
+        return acknowledged_ids
 
     # Prediction Session Operations
-    def create_prediction_session(self, session: PredictionSessionCreate, user_id: str) -> PredictionSession:
+    def create_prediction_session(self, db: Session, session: PredictionSessionCreate, user_id: str) -> PredictionSession:
         """Create new prediction session"""
         db_session = PredictionSession(
             id=str(uuid.uuid4()),
@@ -386,17 +487,17 @@ class ReservoirService:
             model_selection_criteria=session.model_selection_criteria,
             created_by=user_id
         )
-        self.db.add(db_session)
-        self.db.commit()
-        self.db.refresh(db_session)
+        db.add(db_session)
+        db.commit()
         return db_session
 
-    def get_prediction_session(self, session_id: str) -> Optional[PredictionSession]:
+    def get_prediction_session(self, db: Session, session_id: str) -> Optional[PredictionSession]:
         """Get prediction session by ID"""
-        return self.db.query(PredictionSession).filter(PredictionSession.id == session_id).first()
+        return db.query(PredictionSession).filter(PredictionSession.id == session_id).first()
 
     def complete_prediction_session(
-        self, 
+        self,
+        db: Session,
         session_id: str, 
         session_results: Dict[str, Any],
         forecast_ids: List[str] = None,
@@ -404,55 +505,112 @@ class ReservoirService:
         duration_seconds: int = None
     ) -> Optional[PredictionSession]:
         """Complete prediction session with results"""
-        db_session = self.get_prediction_session(session_id)
-        if not db_session:
-            return None
-            
-        db_session.session_results = session_results
-        db_session.generated_forecasts = forecast_ids or []
-        db_session.generated_warnings = warning_ids or []
-        db_session.completed_at = datetime.utcnow()
-        db_session.duration_seconds = duration_seconds
-        
-        self.db.commit()
-        self.db.refresh(db_session)
-        return db_session
+        return self._update_returning(db, PredictionSession, session_id, {
+            'session_results': session_results,
+            'generated_forecasts': forecast_ids or [],
+            'generated_warnings': warning_ids or [],
+            'completed_at': datetime.now(_UTC),
+            'duration_seconds': duration_seconds
+        })
 
     # Utility Methods
-    def get_data_for_analysis(self, data_ids: List[str]) -> List[ReservoirData]:
+    def get_data_for_analysis(self, db: Session, data_ids: List[str]) -> List[ReservoirData]:
         """Get reservoir data for analysis"""
-        return self.db.query(ReservoirData).filter(
+        return db.query(ReservoirData).filter(
             and_(
                 ReservoirData.id.in_(data_ids),
                 ReservoirData.is_processed == True
             )
         ).all()
 
-    def get_simulation_comparison_data(self, simulation_ids: List[str]) -> List[ReservoirSimulation]:
+    def get_simulation_comparison_data(self, db: Session, simulation_ids: List[str]) -> List[ReservoirSimulation]:
         """Get simulations for comparison"""
-        return self.db.query(ReservoirSimulation).filter(
+        return db.query(ReservoirSimulation).filter(
             and_(
                 ReservoirSimulation.id.in_(simulation_ids),
                 ReservoirSimulation.status == SimulationStatus.COMPLETED
             )
         ).all()
 
-    def get_unacknowledged_warnings(self, user_id: str = None) -> List[ReservoirWarning]:
-        """Get unacknowledged warnings, optionally filtered by user"""
-        query = self.db.query(ReservoirWarning).filter(ReservoirWarning.is_acknowledged == False)
+    def get_unacknowledged_warnings(
+        self,
+        db: Session,
+        user_id: str = None,
+        severity_levels: List[WarningLevel] = None,
+        limit: int = 200,
+        cursor: str = None
+    ) -> List[ReservoirWarning]:
+        """Get unacknowledged warnings, most urgent first, optionally filtered by user and severity.
+        
+        Pass encode_warning_cursor() of the last warning of the previous page as `cursor` to
+        continue after it (keyset pagination on severity, creation time and id). The cursor
+        carries the sort key itself, so each page is one query. Results are always bounded by `limit`.
+        """
+        query = db.query(ReservoirWarning).filter(ReservoirWarning.is_acknowledged == False)
+        
+        if user_id:
+            # Warnings from forecasts created by the user; a semi-join, so no forecast columns are read
+            query = query.filter(
+                exists().where(
+                    ReservoirForecast.id == ReservoirWarning.forecast_id,
+                    ReservoirForecast.created_by == user_id
+                )
+            )
+        if severity_levels:
+            query = query.filter(ReservoirWarning.severity_level.in_(severity_levels))
+        if cursor:
+            query = query.filter(
+                tuple_(ReservoirWarning.severity_level, ReservoirWarning.created_at, ReservoirWarning.id)
+                < tuple_(*decode_warning_cursor(cursor))
+            )
+        
+        query = query.order_by(
+            desc(ReservoirWarning.severity_level), desc(ReservoirWarning.created_at), desc(ReservoirWarning.id)
+        )
+            
+        return query.limit(limit).all()
+
+    def get_dashboard_counts(self, db: Session, user_id: str = None) -> Dict[str, int]:
+        """Count unacknowledged warnings by urgency in a single aggregate query"""
+        query = db.query(
+            func.count(ReservoirWarning.id),
+            func.count(ReservoirWarning.id).filter(ReservoirWarning.severity_level == WarningLevel.CRITICAL)
+        ).filter(ReservoirWarning.is_acknowledged == False)
         
         if user_id:
-            # Get warnings from forecasts created by the user
             query = query.join(ReservoirForecast).filter(ReservoirForecast.created_by == user_id)
             
-        return query.order_by(desc(ReservoirWarning.severity_level), desc(ReservoirWarning.created_at)).all()
+        unacknowledged_count, critical_count = query.one()
+        return {
+            'unacknowledged_warnings_count': unacknowledged_count,
+            'critical_warnings_count': critical_count
+        }
 
-    def get_recent_forecasts(self, user_id: str = None, days: int = 30) -> List[ReservoirForecast]:
-        """Get recent forecasts"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        query = self.db.query(ReservoirForecast).filter(ReservoirForecast.generated_at >= cutoff_date)
+    def _recent_forecast_filters(self, user_id: str = None, days: int = 30) -> list:
+        """Build filters selecting forecasts generated in the last `days` days"""
+        cutoff_date = datetime.now(_UTC) - timedelta(days=days)
+        filters = [ReservoirForecast.generated_at >= cutoff_date]
         
         if user_id:
-            query = query.filter(ReservoirForecast.created_by == user_id)
+            filters.append(ReservoirForecast.created_by == user_id)
             
-        return query.order_by(desc(ReservoirForecast.generated_at)).all()
+        return filters
+
+    def get_recent_forecasts(self, db: Session, user_id: str = None, days: int = 30, limit: int = None) -> List[ReservoirForecast]:
+        """Get recent forecasts, newest first"""
+        query = db.query(ReservoirForecast).filter(*self._recent_forecast_filters(user_id, days))
+        query = query.order_by(desc(ReservoirForecast.generated_at))
+        
+        if limit:
+            query = query.limit(limit)
+            
+        return query.all()
+
+    def count_recent_forecasts(self, db: Session, user_id: str = None, days: int = 30) -> int:
+        """Count recent forecasts without loading them"""
+        return db.query(func.count(ReservoirForecast.id)).filter(
+            *self._recent_forecast_filters(user_id, days)
+        ).scalar()
+
+
+reservoir_service = ReservoirService()
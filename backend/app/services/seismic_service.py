@@ -3,30 +3,90 @@ import numpy as np
 import segyio
 import h5py
 import json
-import asyncio
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from pathlib import Path
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import and_, or_, select, exists, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, UploadFile
 import aiofiles
+import logging
+import base64
+import redis
+import redis.asyncio
 
 from app.models.seismic import (
     SeismicDataset, SeismicInterpretation, SeismicAnalysis, 
     SeismicAttribute, SeismicSession
 )
 from app.schemas.seismic import (
-    SeismicDatasetCreate, SeismicDatasetUpdate,
+    SeismicDataset as SeismicDatasetSchema, SeismicDatasetCreate, SeismicDatasetUpdate,
     SeismicInterpretationCreate, SeismicInterpretationUpdate,
     SeismicAnalysisCreate, SeismicAnalysisUpdate,
     ProcessingParameters, VisualizationSettings
 )
 
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Dataset metadata is read far more than written; cache it briefly in Redis
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+DATASET_CACHE_TTL = 60  # seconds
+
+# Set SEISMIC_RAISELOAD=true in development so any undeclared relationship load raises
+RAISELOAD_UNDECLARED = os.getenv("SEISMIC_RAISELOAD", "false").lower() == "true"
+
+def load_strategy(*explicit) -> list:
+    """Loader options for seismic queries, guarding against unplanned lazy loads when enabled"""
+    if RAISELOAD_UNDECLARED:
+        return [*explicit, raiseload("*")]
+    return list(explicit)
+
+def commit_or_404(db: Session, constraint: str, detail: str):
+    """Commit, reporting a violation of the given foreign key as 404 and re-raising any other integrity error"""
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        diag = getattr(exc.orig, "diag", None)
+        if getattr(diag, "constraint_name", None) == constraint:
+            raise HTTPException(status_code=404, detail=detail)
+        raise
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the row a page ended on"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; a malformed cursor is a client error"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_page(query, model, cursor: Optional[str], limit: int):
+    """Newest-first page of `query` after `cursor`, fetching one extra row to detect a next page"""
+    if cursor:
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(*decode_cursor(cursor)))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+def split_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    """Trim the look-ahead row from a keyset_page result and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    items = rows[:limit]
+    return items, encode_cursor(items[-1].created_at, items[-1].id)
+
 class SeismicDataService:
     def __init__(self, upload_dir: str = "uploads/seismic"):
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = redis.Redis.from_url(REDIS_URL)
+        self.async_cache = redis.asyncio.Redis.from_url(REDIS_URL)
         
     async def upload_seismic_file(
         self, 
@@ -50,10 +110,12 @@ class SeismicDataService:
         unique_filename = f"{timestamp}_{file.filename}"
         file_path = self.upload_dir / unique_filename
         
-        # Save file
+        # Stream the upload to disk in chunks rather than buffering it in memory
+        file_size = 0
         async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                await f.write(chunk)
         
         # Extract metadata from file
         try:
@@ -72,7 +134,7 @@ class SeismicDataService:
             description=dataset_create.description,
             file_path=str(file_path),
             file_format=dataset_create.file_format,
-            file_size=len(content),
+            file_size=file_size,
             acquisition_date=dataset_create.acquisition_date,
             uploaded_by=user_id,
             **metadata
@@ -84,24 +146,63 @@ class SeismicDataService:
         
         return dataset
     
-    def get_datasets(
+    async def get_datasets(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         user_id: Optional[int] = None,
         skip: int = 0, 
         limit: int = 100
     ) -> List[SeismicDataset]:
         """Get seismic datasets with optional user filtering"""
-        query = db.query(SeismicDataset)
+        query = select(SeismicDataset).options(*load_strategy())
         
         if user_id:
-            query = query.filter(SeismicDataset.uploaded_by == user_id)
+            query = query.where(SeismicDataset.uploaded_by == user_id)
             
-        return query.offset(skip).limit(limit).all()
+        return (await db.scalars(query.offset(skip).limit(limit))).all()
     
     def get_dataset(self, db: Session, dataset_id: int) -> Optional[SeismicDataset]:
         """Get a specific seismic dataset"""
-        return db.query(SeismicDataset).filter(SeismicDataset.id == dataset_id).first()
+        return db.get(SeismicDataset, dataset_id)
+    
+    async def get_dataset_async(self, db: AsyncSession, dataset_id: int) -> Optional[SeismicDataset]:
+        """Get a specific seismic dataset on an async session"""
+        return await db.get(SeismicDataset, dataset_id)
+    
+    async def get_dataset_cached(self, db: AsyncSession, dataset_id: int) -> Optional[SeismicDatasetSchema]:
+        """Get dataset metadata from Redis, falling back to the database on a miss"""
+        key = self._dataset_cache_key(dataset_id)
+        try:
+            cached = await self.async_cache.get(key)
+            if cached is not None:
+                return SeismicDatasetSchema.model_validate_json(cached)
+        except redis.RedisError as e:
+            logger.warning(f"Dataset cache read failed: {e}")
+        
+        dataset = await self.get_dataset_async(db, dataset_id)
+        if not dataset:
+            return None
+        
+        result = SeismicDatasetSchema.model_validate(dataset)
+        try:
+            await self.async_cache.setex(key, DATASET_CACHE_TTL, result.model_dump_json())
+        except redis.RedisError as e:
+            logger.warning(f"Dataset cache write failed: {e}")
+        return result
+    
+    def invalidate_dataset_cache(self, dataset_id: int):
+        """Drop cached metadata after the dataset changes"""
+        try:
+            self.cache.delete(self._dataset_cache_key(dataset_id))
+        except redis.RedisError as e:
+            logger.warning(f"Dataset cache invalidation failed: {e}")
+    
+    def _dataset_cache_key(self, dataset_id: int) -> str:
+        return f"seismic:dataset:{dataset_id}"
+    
+    async def dataset_exists_async(self, db: AsyncSession, dataset_id: int) -> bool:
+        """Check whether a seismic dataset exists without loading it"""
+        return await db.scalar(select(exists().where(SeismicDataset.id == dataset_id)))
     
     def update_dataset(
         self, 
@@ -119,6 +220,7 @@ class SeismicDataService:
             setattr(dataset, field, value)
         
         db.commit()
+        self.invalidate_dataset_cache(dataset_id)
         db.refresh(dataset)
         return dataset
     
@@ -135,6 +237,7 @@ class SeismicDataService:
         # Delete database record
         db.delete(dataset)
         db.commit()
+        self.invalidate_dataset_cache(dataset_id)
         return True
     
     async def _extract_seismic_metadata(self, file_path: Path, file_extension: str) -> Dict[str, Any]:
@@ -187,6 +290,47 @@ class SeismicDataService:
         except Exception as e:
             raise Exception(f"Error reading HDF5 file: {str(e)}")
     
+    def iter_export(self, dataset: SeismicDataset, export_format: str) -> Iterator[bytes]:
+        """Yield a dataset export piece by piece so it is never held in memory whole"""
+        is_segy = Path(dataset.file_path).suffix.lower() in ('.sgy', '.segy')
+        
+        if export_format == "csv":
+            return self._iter_segy_csv(dataset.file_path) if is_segy else self._iter_hdf5_csv(dataset.file_path)
+        if export_format == "segy" and is_segy or export_format == "hdf5" and not is_segy:
+            return self._iter_file(dataset.file_path)
+        
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot export a {dataset.file_format} dataset as {export_format}"
+        )
+    
+    def _iter_file(self, file_path: str) -> Iterator[bytes]:
+        """Yield the stored file unchanged"""
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+    
+    def _iter_segy_csv(self, file_path: str) -> Iterator[bytes]:
+        """Yield one CSV row per SEG-Y trace"""
+        with segyio.open(file_path, "r", ignore_geometry=True) as segy:
+            yield b"trace,inline,crossline,samples\n"
+            for index, trace in enumerate(segy.trace):
+                header = segy.header[index]
+                samples = " ".join(f"{value:g}" for value in trace)
+                yield (
+                    f"{index},{header[segyio.TraceField.INLINE_3D]},"
+                    f"{header[segyio.TraceField.CROSSLINE_3D]},{samples}\n"
+                ).encode()
+    
+    def _iter_hdf5_csv(self, file_path: str) -> Iterator[bytes]:
+        """Yield one CSV row per trace of the HDF5 data cube"""
+        with h5py.File(file_path, 'r') as hdf:
+            data = hdf['data']
+            yield b"index,samples\n"
+            for index in np.ndindex(data.shape[:-1]):
+                samples = " ".join(f"{value:g}" for value in data[index])
+                yield f"{'/'.join(map(str, index))},{samples}\n".encode()
+    
     def _is_valid_seismic_format(self, filename: str) -> bool:
         """Check if the file format is supported"""
         valid_extensions = {'.sgy', '.segy', '.h5', '.hdf5'}
@@ -215,77 +359,10 @@ class SeismicAnalysisService:
         )
         
         db.add(analysis)
-        db.commit()
+        commit_or_404(db, "seismic_analyses_dataset_id_fkey", "Dataset not found")
         db.refresh(analysis)
         
-        # Start background processing
-        asyncio.create_task(self._process_analysis(analysis.id, db))
-        
         return analysis
-    
-    async def _process_analysis(self, analysis_id: int, db: Session):
-        """Background processing of seismic analysis"""
-        analysis = db.query(SeismicAnalysis).filter(SeismicAnalysis.id == analysis_id).first()
-        if not analysis:
-            return
-        
-        try:
-            analysis.status = "running"
-            db.commit()
-            
-            # Get dataset
-            dataset = db.query(SeismicDataset).filter(SeismicDataset.id == analysis.dataset_id).first()
-            if not dataset:
-                raise Exception("Dataset not found")
-            
-            # Process based on analysis type
-            if analysis.analysis_type == "noise_reduction":
-                result = await self._apply_noise_reduction(dataset.file_path, analysis.parameters)
-            elif analysis.analysis_type == "migration":
-                result = await self._apply_migration(dataset.file_path, analysis.parameters)
-            elif analysis.analysis_type == "attribute_analysis":
-                result = await self._compute_attributes(dataset.file_path, analysis.parameters)
-            else:
-                raise Exception(f"Unsupported analysis type: {analysis.analysis_type}")
-            
-            # Save results
-            result_file = self.processing_dir / f"analysis_{analysis_id}_result.h5"
-            await self._save_analysis_result(result, result_file)
-            
-            # Update analysis record
-            analysis.status = "completed"
-            analysis.result_file_path = str(result_file)
-            analysis.completed_at = datetime.now()
-            analysis.progress = 100.0
-            
-        except Exception as e:
-            analysis.status = "failed"
-            analysis.error_message = str(e)
-            analysis.progress = 0.0
-        
-        finally:
-            db.commit()
-    
-    async def _apply_noise_reduction(self, file_path: str, parameters: Dict[str, Any]) -> np.ndarray:
-        """Apply noise reduction algorithms"""
-        # Placeholder for noise reduction implementation
-        # This would use scipy.signal filters
-        pass
-    
-    async def _apply_migration(self, file_path: str, parameters: Dict[str, Any]) -> np.ndarray:
-        """Apply seismic migration"""
-        # Placeholder for migration implementation
-        pass
-    
-    async def _compute_attributes(self, file_path: str, parameters: Dict[str, Any]) -> np.ndarray:
-        """Compute seismic attributes"""
-        # Placeholder for attribute computation
-        pass
-    
-    async def _save_analysis_result(self, result: np.ndarray, file_path: Path):
-        """Save analysis results to file"""
-        with h5py.File(str(file_path), 'w') as f:
-            f.create_dataset('data', data=result)
 
 class SeismicInterpretationService:
     def create_interpretation(
@@ -310,27 +387,30 @@ class SeismicInterpretationService:
         )
         
         db.add(interpretation)
-        db.commit()
+        commit_or_404(db, "seismic_interpretations_dataset_id_fkey", "Dataset not found")
         db.refresh(interpretation)
         
         return interpretation
     
-    def get_interpretations(
+    async def get_interpretations(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         dataset_id: int,
-        interpretation_type: Optional[str] = None
-    ) -> List[SeismicInterpretation]:
-        """Get interpretations for a dataset"""
-        query = db.query(SeismicInterpretation).filter(
+        interpretation_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[SeismicInterpretation], Optional[str]]:
+        """Get a page of interpretations for a dataset and the cursor for the next one"""
+        query = select(SeismicInterpretation).options(*load_strategy()).where(
             SeismicInterpretation.dataset_id == dataset_id,
             SeismicInterpretation.is_active == True
         )
         
         if interpretation_type:
-            query = query.filter(SeismicInterpretation.interpretation_type == interpretation_type)
+            query = query.where(SeismicInterpretation.interpretation_type == interpretation_type)
         
-        return query.all()
+        query = keyset_page(query, SeismicInterpretation, cursor, limit)
+        return split_page((await db.scalars(query)).all(), limit)
     
     def update_interpretation(
         self, 
@@ -339,9 +419,7 @@ class SeismicInterpretationService:
         interpretation_update: SeismicInterpretationUpdate
     ) -> Optional[SeismicInterpretation]:
         """Update an interpretation"""
-        interpretation = db.query(SeismicInterpretation).filter(
-            SeismicInterpretation.id == interpretation_id
-        ).first()
+        interpretation = db.get(SeismicInterpretation, interpretation_id)
         
         if not interpretation:
             return None
@@ -366,7 +444,7 @@ class SeismicVisualizationService:
         db: Session
     ) -> Dict[str, Any]:
         """Generate 3D visualization data"""
-        dataset = db.query(SeismicDataset).filter(SeismicDataset.id == dataset_id).first()
+        dataset = db.get(SeismicDataset, dataset_id)
         if not dataset:
             raise HTTPException(status_code=404, detail="Dataset not found")
         
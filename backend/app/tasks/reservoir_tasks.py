@@ -6,7 +6,7 @@ from app.models.reservoir import (
     ReservoirWarning, PredictionSession,
     SimulationStatus, ForecastStatus, WarningLevel
 )
-from app.services.reservoir_service import ReservoirService
+from app.services.reservoir_service import reservoir_service
 from app.schemas.reservoir import ReservoirWarningCreate
 
 import numpy as np
@@ -234,23 +234,22 @@ class ReservoirMLProcessor:
 def run_reservoir_simulation(self, simulation_id: str):
     """Background task for running reservoir simulation"""
     db = SessionLocal()
-    reservoir_service = ReservoirService(db)
     
     try:
         current_task.update_state(state="PROGRESS", meta={"progress": 0, "status": "Starting simulation"})
         
         # Get simulation record
-        simulation = reservoir_service.get_reservoir_simulation(simulation_id)
+        simulation = reservoir_service.get_reservoir_simulation(db, simulation_id)
         if not simulation:
             raise Exception(f"Simulation {simulation_id} not found")
         
         # Mark simulation as started
-        reservoir_service.start_simulation(simulation_id)
+        reservoir_service.start_simulation(db, simulation_id)
         
         current_task.update_state(state="PROGRESS", meta={"progress": 10, "status": "Loading reservoir data"})
         
         # Get reservoir data
-        reservoir_data = reservoir_service.get_reservoir_data(simulation.reservoir_data_id)
+        reservoir_data = reservoir_service.get_reservoir_data(db, simulation.reservoir_data_id)
         if not reservoir_data:
             raise Exception("Reservoir data not found")
         
@@ -278,6 +277,7 @@ def run_reservoir_simulation(self, simulation_id: str):
         
         # Complete simulation
         reservoir_service.complete_simulation(
+            db,
             simulation_id,
             simulation_results,
             visualization_data,
@@ -294,7 +294,7 @@ def run_reservoir_simulation(self, simulation_id: str):
         logger.error(traceback.format_exc())
         
         # Mark simulation as failed
-        reservoir_service.fail_simulation(simulation_id, str(e))
+        reservoir_service.fail_simulation(db, simulation_id, str(e))
         
         current_task.update_state(state="FAILURE", meta={"error": str(e)})
         raise
@@ -307,14 +307,13 @@ def run_reservoir_simulation(self, simulation_id: str):
 def run_predictive_analysis(self, session_id: str, analysis_config: Dict[str, Any]):
     """Background task for running predictive analysis (main flow implementation)"""
     db = SessionLocal()
-    reservoir_service = ReservoirService(db)
     ml_processor = ReservoirMLProcessor()
     
     try:
         current_task.update_state(state="PROGRESS", meta={"progress": 0, "status": "Initializing analysis"})
         
         # Get prediction session
-        session = reservoir_service.get_prediction_session(session_id)
+        session = reservoir_service.get_prediction_session(db, session_id)
         if not session:
             raise Exception(f"Prediction session {session_id} not found")
         
@@ -323,7 +322,7 @@ def run_predictive_analysis(self, session_id: str, analysis_config: Dict[str, An
         current_task.update_state(state="PROGRESS", meta={"progress": 10, "status": "Loading and preprocessing data"})
         
         # Step 2 & 3: Load and preprocess data
-        reservoir_data_list = reservoir_service.get_data_for_analysis(session.data_sources)
+        reservoir_data_list = reservoir_service.get_data_for_analysis(db, session.data_sources)
         if not reservoir_data_list:
             raise Exception("No processed reservoir data found for analysis")
         
@@ -411,6 +410,7 @@ def run_predictive_analysis(self, session_id: str, analysis_config: Dict[str, An
         
         # Create forecast record
         forecast = reservoir_service.create_reservoir_forecast(
+            db,
             {
                 'name': f"Forecast from {session.session_name}",
                 'description': f"ML-generated forecast using {best_model_name} model",
@@ -422,7 +422,7 @@ def run_predictive_analysis(self, session_id: str, analysis_config: Dict[str, An
         )
         
         # Update forecast with results
-        reservoir_service.update_reservoir_forecast(forecast.id, {
+        reservoir_service.update_reservoir_forecast(db, forecast.id, {
             'model_parameters': models_config.get(best_model_name, {}),
             'training_data_info': {
                 'training_samples': len(X_train),
@@ -436,14 +436,11 @@ def run_predictive_analysis(self, session_id: str, analysis_config: Dict[str, An
             'status': 'published'
         })
         
-        # Create warnings
-        created_warnings = []
-        for warning_data in potential_warnings:
-            warning = reservoir_service.create_reservoir_warning({
-                'forecast_id': forecast.id,
-                **warning_data
-            })
-            created_warnings.append(warning.id)
+        # Create warnings in one batch
+        created_warnings = reservoir_service.create_warnings_bulk(db, [
+            {'forecast_id': forecast.id, **warning_data}
+            for warning_data in potential_warnings
+        ])
         
         current_task.update_state(state="PROGRESS", meta={"progress": 95, "status": "Finalizing session"})
         
@@ -464,6 +461,7 @@ def run_predictive_analysis(self, session_id: str, analysis_config: Dict[str, An
         }
         
         reservoir_service.complete_prediction_session(
+            db,
             session_id,
             session_results,
             [forecast.id],
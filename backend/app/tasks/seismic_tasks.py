@@ -15,7 +15,7 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, acks_late=True)
 def process_seismic_analysis(self, analysis_id: int):
     """Background task for processing seismic analysis"""
     db = SessionLocal()
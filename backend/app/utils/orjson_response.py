@@ -0,0 +1,26 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        )
+
+
+class ModelJSONResponse(Response):
+    """Response for a Pydantic model, serialized once by pydantic-core without a jsonable_encoder pass"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode()